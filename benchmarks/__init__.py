@@ -0,0 +1,13 @@
+"""
+Benchmarks of pyteamcity.future's client-side hot paths.
+
+Run them from the repository root with::
+
+    python -m benchmarks [--scale 0.1] [-k crawl] [--json results.json]
+
+Payloads are generated by `pyteamcity.future.fake_server`, and crawls go
+through a local `FakeTeamCityServer`, or a HAR recording of one to leave
+the network out. Save results with `--json` and check a later run against
+them with `--compare results.json`, which fails when a metric regressed
+by more than `--tolerance`.
+"""
@@ -0,0 +1,74 @@
+import argparse
+import json
+import sys
+
+from . import bench_entities, bench_crawl  # noqa
+from .common import BENCHMARKS
+
+
+def _key(result):
+    return '%s [%s]' % (result.name, result.unit)
+
+
+def compare(results, baseline, tolerance):
+    """Return a message for each result that regressed from `baseline`"""
+    regressions = []
+    for result in results:
+        base = baseline.get(_key(result))
+        if base is None:
+            continue
+        if result.higher_is_better:
+            regressed = result.value < base['value'] * (1 - tolerance)
+        else:
+            regressed = result.value > base['value'] * (1 + tolerance)
+        if regressed:
+            regressions.append('%s: %.4g, baseline %.4g' % (
+                _key(result), result.value, base['value']))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog='python -m benchmarks',
+        description='Benchmark pyteamcity.future client-side hot paths')
+    parser.add_argument(
+        '--scale', type=float, default=1.0,
+        help='multiplier of the number of entities benchmarked')
+    parser.add_argument(
+        '-k', dest='filter', default='',
+        help='only run benchmarks whose name contains this')
+    parser.add_argument('--json', help='write results to this file')
+    parser.add_argument(
+        '--compare', help='fail if results regressed from this JSON file')
+    parser.add_argument(
+        '--tolerance', type=float, default=0.1,
+        help='relative regression tolerated by --compare')
+    args = parser.parse_args(argv)
+
+    results = []
+    for function in BENCHMARKS:
+        if args.filter not in function.__name__:
+            continue
+        for result in function(args.scale):
+            results.append(result)
+            print('%-45s %14.4f %s' % (result.name, result.value, result.unit))
+            sys.stdout.flush()
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(dict(
+                (_key(result), result._asdict()) for result in results),
+                f, indent=2, sort_keys=True)
+
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        for regression in regressions:
+            print('REGRESSION ' + regression)
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
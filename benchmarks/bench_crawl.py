@@ -0,0 +1,87 @@
+import os
+import shutil
+import tempfile
+import time
+
+from pyteamcity.future import PageJoiner, TeamCity
+from pyteamcity.future.fake_server import DataGenerator, FakeTeamCityServer
+
+from .common import benchmark, duration, rate
+
+
+def _crawl(name, scale, crawl, **kwargs):
+    builds = int(20000 * scale)
+    generator = DataGenerator(builds=builds, build_types=100)
+    with FakeTeamCityServer(generator) as server:
+        tc = server.teamcity(**kwargs)
+        start = time.perf_counter()
+        count = crawl(tc)
+        seconds = time.perf_counter() - start
+    assert count == builds, (count, builds)
+    pages = (builds + 99) // 100
+    return [
+        duration(name, seconds),
+        rate(name, pages, seconds, 'pages'),
+        rate(name, builds, seconds, 'entities'),
+    ]
+
+
+@benchmark
+def crawl_builds(scale):
+    return _crawl(
+        'crawl_builds', scale,
+        lambda tc: sum(1 for _ in tc.builds.all().iterator()))
+
+
+@benchmark
+def crawl_builds_prefetch(scale):
+    return _crawl(
+        'crawl_builds_prefetch', scale,
+        lambda tc: sum(1 for _ in tc.builds.all().iterator(prefetch=2)))
+
+
+@benchmark
+def crawl_builds_page_joiner(scale):
+    return _crawl(
+        'crawl_builds_page_joiner', scale,
+        lambda tc: sum(1 for _ in PageJoiner(tc.builds.all())))
+
+
+@benchmark
+def crawl_builds_fetch_all_parallel(scale):
+    def crawl(tc):
+        query_set = tc.builds.all()
+        query_set.fetch_all(parallel=4)
+        return sum(1 for _ in query_set)
+
+    return _crawl(
+        'crawl_builds_fetch_all_parallel', scale, crawl, pool_maxsize=4)
+
+
+@benchmark
+def replay_crawl_builds(scale):
+    """Crawl from a HAR recording, to time the client without the network"""
+    builds = int(20000 * scale)
+    directory = tempfile.mkdtemp()
+    path = os.path.join(directory, 'crawl.har')
+    try:
+        generator = DataGenerator(builds=builds, build_types=100)
+        with FakeTeamCityServer(generator) as server:
+            tc = server.teamcity(record_to=path)
+            sum(1 for _ in tc.builds.all().iterator())
+            tc.recorder.close()
+
+        tc = TeamCity(
+            server=server.host, port=server.port, replay_from=path)
+        start = time.perf_counter()
+        count = sum(1 for _ in tc.builds.all().iterator())
+        seconds = time.perf_counter() - start
+    finally:
+        shutil.rmtree(directory)
+    assert count == builds, (count, builds)
+    pages = (builds + 99) // 100
+    return [
+        duration('replay_crawl_builds', seconds),
+        rate('replay_crawl_builds', pages, seconds, 'pages'),
+        rate('replay_crawl_builds', builds, seconds, 'entities'),
+    ]
@@ -0,0 +1,144 @@
+import json
+
+from pyteamcity.future.build import Build
+from pyteamcity.future.core.json_stream import iter_array
+from pyteamcity.future.core.queryset import QuerySet
+from pyteamcity.future.core.utils import parse_date_string
+from pyteamcity.future.fake_server import DataGenerator
+from pyteamcity.future.fake_server.app import SHORT_FIELDS
+
+from .common import (
+    benchmark, best_time, peak_memory, rate, Result, retained_memory)
+
+
+def _builds(count, long=False):
+    generator = DataGenerator(builds=count)
+    builds = [generator.entity('builds', i) for i in range(count)]
+    if not long:
+        builds = [
+            dict((key, d[key]) for key in SHORT_FIELDS['builds'] + (
+                'queuedDate', 'startDate', 'finishDate') if key in d)
+            for d in builds]
+    return builds
+
+
+@benchmark
+def json_decode(scale):
+    builds = _builds(int(100000 * scale))
+    pages = [
+        json.dumps({'count': 100, 'build': builds[i:i + 100]})
+        for i in range(0, len(builds), 100)]
+    seconds = best_time(lambda: [json.loads(page) for page in pages])
+    return [rate('json_decode', len(pages), seconds, 'pages')]
+
+
+@benchmark
+def build_from_dict(scale):
+    builds = _builds(int(100000 * scale), long=True)
+    seconds = best_time(lambda: [Build.from_dict(d) for d in builds])
+    return [rate('build_from_dict', len(builds), seconds, 'entities')]
+
+
+@benchmark
+def parse_dates(scale):
+    dates = [
+        d[key] for d in _builds(int(50000 * scale))
+        for key in ('queuedDate', 'startDate', 'finishDate') if key in d]
+    seconds = best_time(lambda: [parse_date_string(date) for date in dates])
+    return [rate('parse_date_string', len(dates), seconds, 'dates')]
+
+
+@benchmark
+def sort_by_finish_date(scale):
+    builds = [
+        Build.from_dict(d) for d in _builds(int(100000 * scale))
+        if 'finishDate' in d]
+    seconds = best_time(
+        lambda: sorted(builds, key=lambda build: build.finish_date),
+        repeat=1)
+    return [rate('sort_by_finish_date', len(builds), seconds, 'entities')]
+
+
+def _memory_per_100k_builds(name, scale, keep_raw):
+    count = int(100000 * scale)
+    pages = [
+        json.dumps({'count': 100, 'build': page}).encode('utf-8')
+        for page in (
+            _builds(count)[i:i + 100] for i in range(0, count, 100))]
+
+    def load():
+        builds = []
+        for page in pages:
+            for d in json.loads(page)['build']:
+                build = Build.from_dict(d)
+                if not keep_raw:
+                    QuerySet._drop_raw(build)
+                builds.append(build)
+        return builds
+
+    builds, size = retained_memory(load)
+    per_100k = size * 100000.0 / len(builds) / (1024 * 1024)
+    return [Result(name, per_100k, 'MiB', False)]
+
+
+@benchmark
+def memory_per_100k_builds(scale):
+    return _memory_per_100k_builds('memory_per_100k_builds', scale, True)
+
+
+@benchmark
+def memory_per_100k_builds_without_raw(scale):
+    return _memory_per_100k_builds(
+        'memory_per_100k_builds_without_raw', scale, False)
+
+
+@benchmark
+def columns_from_pages(scale):
+    try:
+        import numpy
+    except ImportError:
+        return []
+    from pyteamcity.future.core.columns import ColumnBuilder
+
+    builds = _builds(int(100000 * scale))
+    pages = [builds[i:i + 100] for i in range(0, len(builds), 100)]
+    fields = ['id', 'status', 'buildTypeId', 'startDate', 'finishDate']
+
+    def load():
+        builder = ColumnBuilder(fields, numpy)
+        for page in pages:
+            builder.add_page(page)
+        return builder.columns()
+
+    seconds = best_time(load)
+    return [rate('columns_from_pages', len(builds), seconds, 'entities')]
+
+
+def _peak_memory_large_page(name, scale, stream):
+    count = int(10000 * scale)
+    page = json.dumps({'count': count, 'build': _builds(count, long=True)})
+    page = page.encode('utf-8')
+
+    def load():
+        if stream:
+            chunks = (
+                page[i:i + 65536] for i in range(0, len(page), 65536))
+            items = iter_array(chunks, 'build', {})
+        else:
+            items = json.loads(page)['build']
+        for d in items:
+            Build.from_dict(d)
+
+    size = peak_memory(load)
+    return [Result(name, size / (1024.0 * 1024), 'MiB', False)]
+
+
+@benchmark
+def peak_memory_large_page(scale):
+    return _peak_memory_large_page('peak_memory_large_page', scale, False)
+
+
+@benchmark
+def peak_memory_large_page_stream(scale):
+    return _peak_memory_large_page(
+        'peak_memory_large_page_stream', scale, True)
@@ -0,0 +1,62 @@
+import collections
+import gc
+import time
+import tracemalloc
+
+Result = collections.namedtuple(
+    'Result', ['name', 'value', 'unit', 'higher_is_better'])
+
+BENCHMARKS = []
+
+
+def benchmark(function):
+    """Register `function(scale)`, which returns a list of `Result`s"""
+    BENCHMARKS.append(function)
+    return function
+
+
+def best_time(function, repeat=3):
+    """Return the fastest of `repeat` timings of `function()`, in seconds"""
+    timings = []
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def rate(name, count, seconds, unit):
+    return Result(name, count / seconds, unit + '/s', True)
+
+
+def duration(name, seconds):
+    return Result(name, seconds, 's', False)
+
+
+def retained_memory(function):
+    """
+    Return the result of `function()` and the bytes it allocated that are
+    still in use when it returns.
+    """
+    gc.collect()
+    tracemalloc.start()
+    try:
+        result = function()
+        gc.collect()
+        current, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return result, current
+
+
+def peak_memory(function):
+    """Return the most bytes allocated at once while `function()` runs"""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        function()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak
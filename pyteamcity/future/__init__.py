@@ -4,3 +4,11 @@
 
 from .page_joiner import PageJoiner  # noqa
 from .teamcity import TeamCity  # noqa
+from .async_teamcity import AsyncTeamCity  # noqa
+from .core.identity_map import IdentityMap  # noqa
+from .core.http_cache import FileCacheStore, HTTPCache, MemoryCacheStore  # noqa
+from .core.build_store import BuildStore  # noqa
+from .core.retry import RetryPolicy  # noqa
+from .core.single_flight import SingleFlight  # noqa
+from .core.metrics import MetricsCollector  # noqa
+from .core.har import HARRecorder, HARReplayAdapter  # noqa
@@ -2,6 +2,7 @@ import requests
 
 from .core.parameter import Parameter
 from .core.queryset import QuerySet
+from .core.related import get_related, Relation
 
 from .agent_pool import AgentPoolQuerySet
 
@@ -14,6 +15,10 @@ class Agent(object):
      u'id', u'pool']
     """
 
+    __slots__ = (
+        'id', 'href', 'name', 'type_id', 'ip', 'enabled', 'connected',
+        'authorized', 'pool_id', 'query_set', '_data_dict', '_related')
+
     def __init__(self, id, href, name, type_id, ip,
                  enabled, connected, authorized,
                  pool_id,
@@ -54,9 +59,7 @@ class Agent(object):
 
     @property
     def pool(self):
-        teamcity = self.query_set.teamcity
-        agent_pool = AgentPoolQuerySet(teamcity).get(id=self.pool_id)
-        return agent_pool
+        return get_related(self, 'pool', AgentPoolQuerySet, self.pool_id)
 
     @property
     def parameters_dict(self):
@@ -127,21 +130,22 @@ class Agent(object):
 class AgentQuerySet(QuerySet):
     uri = '/app/rest/agents/'
     _entity_factory = Agent
+    _data_key = 'agent'
+    _relations = {
+        'pool': Relation('pool', 'pool_id', AgentPoolQuerySet),
+    }
 
     def filter(self, id=None, name=None,
                connected=None, authorized=None, enabled=None):
+        query_set = self._clone()
         if id is not None:
-            self._add_pred('id', id)
+            query_set._add_pred('id', id)
         if name is not None:
-            self._add_pred('name', name)
+            query_set._add_pred('name', name)
         if connected is not None:
-            self._add_pred('connected', connected)
+            query_set._add_pred('connected', connected)
         if authorized is not None:
-            self._add_pred('authorized', authorized)
+            query_set._add_pred('authorized', authorized)
         if enabled is not None:
-            self._add_pred('enabled', enabled)
-        return self
-
-    def __iter__(self):
-        return (self._entity_factory.from_dict(d, self)
-                for d in self._data()['agent'])
+            query_set._add_pred('enabled', enabled)
+        return query_set
@@ -3,6 +3,10 @@ from .project import Project
 
 
 class AgentPool(object):
+    __slots__ = (
+        'id', 'href', 'name', 'query_set', '_data_dict', '_related')
+    _retained_keys = ('agents', 'projects')
+
     def __init__(self, id, href, name,
                  query_set, data_dict=None):
         self.id = id
@@ -47,14 +51,13 @@ class AgentPool(object):
 class AgentPoolQuerySet(QuerySet):
     uri = '/app/rest/agentPools/'
     _entity_factory = AgentPool
+    _data_key = 'agentPool'
+    _cacheable = True
 
     def filter(self, id=None, name=None):
+        query_set = self._clone()
         if id is not None:
-            self._add_pred('id', id)
+            query_set._add_pred('id', id)
         if name is not None:
-            self._add_pred('name', name)
-        return self
-
-    def __iter__(self):
-        return (self._entity_factory.from_dict(d, self)
-                for d in self._data()['agentPool'])
+            query_set._add_pred('name', name)
+        return query_set
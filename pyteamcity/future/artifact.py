@@ -2,20 +2,30 @@ import fnmatch
 import os
 
 from . import exceptions
+from .core.n_plus_one import request_origin
 from .core.utils import parse_date_string, raise_on_status
 
 
 class Artifact(object):
+    __slots__ = (
+        'build', 'path', '_data', '_metadata_url')
+
     def __init__(self, build, path=''):
         self.build = build
         self.path = path
         teamcity = self.build.build_query_set.teamcity
         url = self.build.api_url + '/artifacts/metadata/' + self.path
-        res = teamcity.session.get(url)
-        if res.status_code == 404:
-            raise exceptions.ArtifactNotFound(path=path)
-        raise_on_status(res)
-        self._data = res.json()
+
+        def fetch():
+            res = teamcity.session.get(url)
+            if res.status_code == 404:
+                raise exceptions.ArtifactNotFound(path=path)
+            raise_on_status(res)
+            return res.json()
+
+        with request_origin('Artifact.__init__'):
+            self._data = self.build._stored(
+                'artifact-metadata:' + self.path, fetch)
         self._metadata_url = url
 
     @property
@@ -85,9 +95,13 @@ class Artifact(object):
     def listdir(self, pattern=None):
         teamcity = self.build.build_query_set.teamcity
         url = self.build.api_url + '/artifacts/children/' + self.path
-        res = teamcity.session.get(url)
-        raise_on_status(res)
-        data = res.json()
+
+        def fetch():
+            res = teamcity.session.get(url)
+            raise_on_status(res)
+            return res.json()
+
+        data = self.build._stored('artifact-children:' + self.path, fetch)
         ret = []
         for f in data['file']:
             if pattern is None or fnmatch.fnmatch(f['name'], pattern):
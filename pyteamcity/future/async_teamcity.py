@@ -0,0 +1,337 @@
+"""
+asyncio flavour of the client.
+
+`AsyncTeamCity` exposes the same managers as `TeamCity`, but their query
+sets fetch over an `aiohttp` session and have to be awaited::
+
+    async with AsyncTeamCity(server='teamcity') as tc:
+        build = await tc.builds.all().get(id=1234)
+        async for build in tc.builds.all().filter(running=True).iterator():
+            ...
+
+Filtering, locators and the returned entities are shared with the
+blocking API. Methods on the entities themselves (`Build.pin`,
+`Build.build_type`, ...) still go through the blocking `session`.
+Indexing, `to_columns` and parallel `fetch_all` are not supported.
+
+The options and hooks of `TeamCity` that wrap its `requests` session
+(`max_concurrency`, `retry`, `http_cache`, `single_flight`, `metrics`,
+`record_to`, `replay_from`, `on_request`, `on_response` and
+`detect_n_plus_one`) would not see requests made over `aiohttp`, so they
+raise `exceptions.IllegalOperation`.
+"""
+
+import asyncio
+
+from . import exceptions
+from .core.manager import Manager
+from .teamcity import TeamCity
+
+from .agent import AgentQuerySet
+from .agent_pool import AgentPoolQuerySet
+from .build import BuildQuerySet
+from .build_type import BuildTypeQuerySet
+from .change import ChangeQuerySet
+from .project import ProjectQuerySet
+from .queued_build import QueuedBuildQuerySet
+from .test_occurrence import TestQuerySet
+from .user import UserQuerySet
+from .user_group import UserGroupQuerySet
+from .vcs_root import VCSRootQuerySet
+
+
+class AsyncQuerySetMixin(object):
+    async def _fetch(self, details=False, href=None, locator=None,
+                     fields=None):
+        url = self._get_url(
+            details=details, href=href, locator=locator, fields=fields)
+        self.url = url
+        return await self.teamcity._get_json(url)
+
+    async def _data(self, details=False, href=None):
+        if not self._data_dict:
+            self._data_dict = await self._fetch(details=details, href=href)
+
+        return self._data_dict
+
+    async def _iter_pages(self, locator=None):
+        href = None
+        while True:
+            page = await self._fetch(href=href, locator=locator)
+            yield page
+            href = page.get('nextHref')
+            if href is None:
+                break
+
+    def _entities(self, page):
+        # `prefetch_related` is joined by the callers, with `_join_prefetched`
+        items = page.get(self._data_key, [])
+        if not self._select_related:
+            return (self._from_dict(d, self) for d in items)
+        entities = [self._from_dict(d, self) for d in items]
+        self._join_selected(entities)
+        return iter(entities)
+
+    async def _page_entities(self, page):
+        entities = self._entities(page)
+        if self._prefetch_related:
+            entities = list(entities)
+            await self._join_prefetched(entities)
+        return entities
+
+    async def _join_prefetched(self, entities):
+        for name in self._prefetch_related:
+            relation = self._get_relation(name)
+            ids = self._related_ids(relation, entities)
+            if ids:
+                query_set = ASYNC_QUERY_SETS[relation.query_set_class](
+                    self.teamcity)
+                self._set_related(
+                    name, relation, entities, await query_set.in_bulk(ids))
+
+    async def _fetch_chunk(self, ids):
+        locator, fields = self._chunk_query(ids)
+        page = await self._fetch(locator=locator, fields=fields)
+        return list(await self._page_entities(page))
+
+    async def in_bulk(self, ids, chunk_size=100, max_workers=4):
+        found, ids, identity_map = self._in_bulk_lookup(ids)
+        semaphore = asyncio.Semaphore(max_workers)
+
+        async def fetch_chunk(chunk):
+            async with semaphore:
+                return await self._fetch_chunk(chunk)
+
+        results = await asyncio.gather(*[
+            fetch_chunk(ids[i:i + chunk_size])
+            for i in range(0, len(ids), chunk_size)])
+        self._in_bulk_add(found, results, identity_map)
+        return found
+
+    async def iterator(self, keep_raw=True):
+        async for page in self._iter_pages():
+            for entity in await self._page_entities(page):
+                if not keep_raw:
+                    self._drop_raw(entity)
+                yield entity
+
+    async def fetch_all(self, parallel=None):
+        if parallel is not None and parallel > 1:
+            raise exceptions.IllegalOperation(
+                'fetch_all(parallel=...) is not supported with AsyncTeamCity')
+        if self._data_dict:
+            return
+        async for page in self._iter_pages():
+            for key, value in page.items():
+                if key in self._data_dict:
+                    if isinstance(value, list):
+                        self._data_dict[key].extend(value)
+                    elif isinstance(value, int):
+                        self._data_dict[key] += value
+                else:
+                    self._data_dict[key] = value
+        for key, value in self._data_dict.items():
+            if isinstance(value, int) and key != 'count':
+                setattr(self, key, value)
+        return self
+
+    async def count(self):
+        if self._data_dict:
+            return self._data_dict.get('count', 0)
+        if self._count is None:
+            data = await self._fetch(fields='count')
+            self._count = data.get('count', 0)
+        return self._count
+
+    async def get(self, just_url=False,
+                  raise_multiple_objects_returned=False,
+                  **kwargs):
+        identity_map, entity_type = self._identity_map_lookup(kwargs)
+        query_set = self.filter(**kwargs)
+        if just_url:
+            return query_set._get_url(details=True)
+        if identity_map is not None:
+            entity = identity_map.get(entity_type, kwargs['id'])
+            if entity is not None:
+                return entity
+        if raise_multiple_objects_returned and await query_set.count() > 1:
+            raise exceptions.MultipleObjectsReturned()
+        query_set._data_dict = None
+        entity = query_set._from_dict(
+            await query_set._data(details=True), query_set)
+        query_set._join_selected([entity])
+        await query_set._join_prefetched([entity])
+        if identity_map is not None:
+            identity_map.add(entity_type, kwargs['id'], entity)
+        return entity
+
+    def __aiter__(self):
+        return self._aiter_first_page()
+
+    async def _aiter_first_page(self):
+        for entity in await self._page_entities(await self._data()):
+            yield entity
+
+    def __len__(self):
+        raise exceptions.IllegalOperation(
+            'Use `await query_set.count()` with AsyncTeamCity')
+
+    def __iter__(self):
+        raise exceptions.IllegalOperation(
+            'Use `async for` with AsyncTeamCity')
+
+    def __getitem__(self, index):
+        raise exceptions.IllegalOperation(
+            'Indexing is not supported with AsyncTeamCity; use `async for` '
+            'over `iterator()`')
+
+    def to_columns(self, fields):
+        raise exceptions.IllegalOperation(
+            'to_columns() is not supported with AsyncTeamCity')
+
+    def to_dataframe(self, fields):
+        raise exceptions.IllegalOperation(
+            'to_dataframe() is not supported with AsyncTeamCity')
+
+
+class AsyncProjectQuerySet(AsyncQuerySetMixin, ProjectQuerySet):
+    pass
+
+
+class AsyncBuildTypeQuerySet(AsyncQuerySetMixin, BuildTypeQuerySet):
+    pass
+
+
+class AsyncBuildQuerySet(AsyncQuerySetMixin, BuildQuerySet):
+    pass
+
+
+class AsyncQueuedBuildQuerySet(AsyncQuerySetMixin, QueuedBuildQuerySet):
+    pass
+
+
+class AsyncUserQuerySet(AsyncQuerySetMixin, UserQuerySet):
+    pass
+
+
+class AsyncUserGroupQuerySet(AsyncQuerySetMixin, UserGroupQuerySet):
+    pass
+
+
+class AsyncAgentQuerySet(AsyncQuerySetMixin, AgentQuerySet):
+    pass
+
+
+class AsyncAgentPoolQuerySet(AsyncQuerySetMixin, AgentPoolQuerySet):
+    pass
+
+
+class AsyncVCSRootQuerySet(AsyncQuerySetMixin, VCSRootQuerySet):
+    pass
+
+
+class AsyncChangeQuerySet(AsyncQuerySetMixin, ChangeQuerySet):
+    pass
+
+
+class AsyncTestQuerySet(AsyncQuerySetMixin, TestQuerySet):
+    pass
+
+
+ASYNC_QUERY_SETS = {
+    ProjectQuerySet: AsyncProjectQuerySet,
+    BuildTypeQuerySet: AsyncBuildTypeQuerySet,
+    BuildQuerySet: AsyncBuildQuerySet,
+    QueuedBuildQuerySet: AsyncQueuedBuildQuerySet,
+    UserQuerySet: AsyncUserQuerySet,
+    UserGroupQuerySet: AsyncUserGroupQuerySet,
+    AgentQuerySet: AsyncAgentQuerySet,
+    AgentPoolQuerySet: AsyncAgentPoolQuerySet,
+    VCSRootQuerySet: AsyncVCSRootQuerySet,
+    ChangeQuerySet: AsyncChangeQuerySet,
+    TestQuerySet: AsyncTestQuerySet,
+}
+
+
+class AsyncTeamCity(TeamCity):
+    async_session = None
+
+    unsupported_options = (
+        'max_concurrency', 'retry', 'http_cache', 'single_flight', 'metrics',
+        'record_to', 'replay_from')
+
+    def __init__(self, *args, **kwargs):
+        unsupported = [
+            name for name in self.unsupported_options
+            if kwargs.get(name) is not None]
+        if unsupported:
+            raise exceptions.IllegalOperation(
+                'AsyncTeamCity does not support %s' % ', '.join(unsupported))
+        self.async_session = kwargs.pop('async_session', None)
+        super(AsyncTeamCity, self).__init__(*args, **kwargs)
+        for name, query_set_factory in [
+                ('projects', AsyncProjectQuerySet),
+                ('build_types', AsyncBuildTypeQuerySet),
+                ('builds', AsyncBuildQuerySet),
+                ('queued_builds', AsyncQueuedBuildQuerySet),
+                ('users', AsyncUserQuerySet),
+                ('user_groups', AsyncUserGroupQuerySet),
+                ('agents', AsyncAgentQuerySet),
+                ('agent_pools', AsyncAgentPoolQuerySet),
+                ('vcs_roots', AsyncVCSRootQuerySet),
+                ('changes', AsyncChangeQuerySet),
+                ('tests', AsyncTestQuerySet)]:
+            setattr(self, name, Manager(
+                teamcity=self,
+                query_set_factory=query_set_factory))
+
+    def on_request(self, hook):
+        raise exceptions.IllegalOperation(
+            'AsyncTeamCity does not support on_request hooks')
+
+    def on_response(self, hook):
+        raise exceptions.IllegalOperation(
+            'AsyncTeamCity does not support on_response hooks')
+
+    def detect_n_plus_one(self, threshold=10, action='warn'):
+        raise exceptions.IllegalOperation(
+            'AsyncTeamCity does not support detect_n_plus_one')
+
+    def _get_async_session(self):
+        if self.async_session is None:
+            try:
+                import aiohttp
+            except ImportError:  # pragma: no cover
+                raise ImportError(
+                    'AsyncTeamCity requires aiohttp; '
+                    'install pyteamcity[async]')
+            auth = None
+            if self.username and self.password:
+                auth = aiohttp.BasicAuth(self.username, self.password)
+            self.async_session = aiohttp.ClientSession(
+                auth=auth, headers={'Accept': 'application/json'})
+        return self.async_session
+
+    async def _get_json(self, url):
+        async with self._get_async_session().get(url) as res:
+            if res.status >= 400:
+                if res.status == 401:
+                    exception_class = exceptions.UnauthorizedError
+                else:
+                    exception_class = exceptions.HTTPError
+                raise exception_class(
+                    status_code=res.status,
+                    reason=res.reason,
+                    text=await res.text())
+            return await res.json(content_type=None)
+
+    async def close(self):
+        if self.async_session is not None:
+            await self.async_session.close()
+            self.async_session = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
@@ -3,15 +3,23 @@ from six.moves.urllib.parse import quote
 from . import exceptions
 from .core.parameter import Parameter
 from .core.queryset import QuerySet
+from .core.related import get_related, Relation
 from .core.utils import parse_date_string, raise_on_status
 
-from .agent import Agent
+from .agent import Agent, AgentQuerySet
 from .artifact import Artifact
 from .build_type import BuildTypeQuerySet
 from .user import User
 
 
 class Build(object):
+    __slots__ = (
+        'id', 'number', 'queued_date_string', 'start_date_string',
+        'finish_date_string', 'build_type_id', 'state', 'status',
+        'branch_name', 'href', 'build_query_set', 'teamcity', '_data_dict',
+        '_related')
+    _retained_keys = ('webUrl', 'agent', 'triggered')
+
     def __init__(self, id, number,
                  build_type_id,
                  queued_date_string, start_date_string, finish_date_string,
@@ -52,7 +60,8 @@ class Build(object):
 
     @property
     def agent(self):
-        return Agent.from_dict(self._data_dict.get('agent'))
+        if 'agent' in self._data_dict:
+            return Agent.from_dict(self._data_dict['agent'])
 
     @property
     def web_url(self):
@@ -60,7 +69,8 @@ class Build(object):
 
     @property
     def build_type(self):
-        return BuildTypeQuerySet(self.teamcity).get(id=self.build_type_id)
+        return get_related(
+            self, 'build_type', BuildTypeQuerySet, self.build_type_id)
 
     def __repr__(self):
         return '<%s.%s: id=%r build_type_id=%r number=%r>' % (
@@ -101,6 +111,20 @@ class Build(object):
 
         return d
 
+    def _stored(self, kind, fetch):
+        """
+        Return `fetch()`, going through the client's build store if there
+        is one and this build is finished.
+        """
+        build_store = getattr(self.teamcity, 'build_store', None)
+        if build_store is None or self.state != 'finished':
+            return fetch()
+        data = build_store.get(self.id, kind)
+        if data is None:
+            data = fetch()
+            build_store.set(self.id, kind, data)
+        return data
+
     @property
     def api_url(self):
         teamcity = self.build_query_set.teamcity
@@ -158,12 +182,15 @@ class Build(object):
 
     @property
     def resulting_properties(self):
-        url = self.teamcity.base_base_url + self.href + '/resulting-properties'
-        headers = {'Origin': self.teamcity.base_base_url, 'Content-Type': 'application/xml'}
-        res = self.teamcity.session.get(url=url, headers=headers)
-        raise_on_status(res)
+        def fetch():
+            url = self.teamcity.base_base_url + self.href + '/resulting-properties'
+            headers = {'Origin': self.teamcity.base_base_url, 'Content-Type': 'application/xml'}
+            res = self.teamcity.session.get(url=url, headers=headers)
+            raise_on_status(res)
+            return res.json()
+
         d = {}
-        for param in res.json()['property']:
+        for param in self._stored('resulting-properties', fetch)['property']:
             param_obj = Parameter()
             if 'value' in param:
                 param_obj.value = param['value']
@@ -216,6 +243,12 @@ class Build(object):
 class BuildQuerySet(QuerySet):
     uri = '/app/rest/builds/'
     _entity_factory = Build
+    _data_key = 'build'
+    _paged = True
+    _relations = {
+        'build_type': Relation('buildType', 'build_type_id', BuildTypeQuerySet),
+        'agent': Relation('agent', None, AgentQuerySet),
+    }
 
     def filter(self,
                id=None,
@@ -226,52 +259,67 @@ class BuildQuerySet(QuerySet):
                agent_name=None, personal=None,
                canceled=None, failed_to_start=None, running=None,
                start=None, count=None, lookup_limit=None, default_filter=None):
+        query_set = self._clone()
         if id is not None:
-            self._add_pred('id', id)
+            query_set._add_pred('id', id)
         if project is not None:
-            self._add_pred('project', '(%s)' % project)
+            query_set._add_pred('project', '(%s)' % project)
         if affected_project is not None:
-            self._add_pred('affectedProject', '(%s)' % affected_project)
+            query_set._add_pred('affectedProject', '(%s)' % affected_project)
         if build_type is not None:
-            self._add_pred('buildType', build_type)
+            query_set._add_pred('buildType', build_type)
         if number is not None:
-            self._add_pred('number', number)
+            query_set._add_pred('number', number)
         if branch is not None:
-            self._add_pred('branch', branch)
+            query_set._add_pred('branch', branch)
         if user is not None:
-            self._add_pred('user', '(%s)' % user)
+            query_set._add_pred('user', '(%s)' % user)
         if tags is not None:
             if not hasattr(tags, 'split'):
                 tags = ','.join(tags)
-            self._add_pred('tags', tags)
+            query_set._add_pred('tags', tags)
         if pinned is not None:
-            self._add_pred('pinned', pinned)
+            query_set._add_pred('pinned', pinned)
         if since_build is not None:
-            self._add_pred('sinceBuild', '(%s)' % since_build)
+            query_set._add_pred('sinceBuild', '(%s)' % since_build)
         if since_date is not None:
             since_date = self._get_since_date(since_date)
-            self._add_pred('sinceDate', since_date)
+            query_set._add_pred('sinceDate', since_date)
         if status is not None:
-            self._add_pred('status', status)
+            query_set._add_pred('status', status)
         if agent_name is not None:
-            self._add_pred('agentName', agent_name)
+            query_set._add_pred('agentName', agent_name)
         if personal is not None:
-            self._add_pred('personal', personal)
+            query_set._add_pred('personal', personal)
         if canceled is not None:
-            self._add_pred('canceled', canceled)
+            query_set._add_pred('canceled', canceled)
         if failed_to_start is not None:
-            self._add_pred('failedToStart', failed_to_start)
+            query_set._add_pred('failedToStart', failed_to_start)
         if running is not None:
-            self._add_pred('running', running)
+            query_set._add_pred('running', running)
         if start is not None:
-            self._add_pred('start', start)
+            query_set._add_pred('start', start)
         if count is not None:
-            self._add_pred('count', count)
+            query_set._add_pred('count', count)
         if lookup_limit is not None:
-            self._add_pred('lookupLimit', lookup_limit)
+            query_set._add_pred('lookupLimit', lookup_limit)
         if default_filter is not None:
-            self._add_pred('defaultFilter', default_filter)
-        return self
+            query_set._add_pred('defaultFilter', default_filter)
+        return query_set
+
+    def get(self, just_url=False, **kwargs):
+        build_store = getattr(self.teamcity, 'build_store', None)
+        if build_store is None or just_url or not self._is_id_lookup(kwargs):
+            return super(BuildQuerySet, self).get(just_url=just_url, **kwargs)
+
+        d = build_store.get(kwargs['id'])
+        if d is not None:
+            query_set = self.filter(**kwargs)
+            return query_set._from_dict(d, query_set)
+        build = super(BuildQuerySet, self).get(**kwargs)
+        if build.state == 'finished':
+            build_store.set(build.id, 'build', build._data_dict)
+        return build
 
     def _get_since_date(self, since_date):
         if hasattr(since_date, 'strftime'):
@@ -283,7 +331,3 @@ class BuildQuerySet(QuerySet):
 
         since_date = quote(since_date)
         return since_date
-
-    def __iter__(self):
-        return (Build.from_dict(d, self, teamcity=self.teamcity)
-                for d in self._data()['build'])
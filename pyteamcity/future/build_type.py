@@ -1,11 +1,24 @@
 import json
 
+from .core.identity_map import discard_entity
 from .core.parameter import Parameter
 from .core.queryset import QuerySet
+from .core.related import get_related, Relation
 from .core.utils import raise_on_status
 
 
+def _project_query_set():
+    from .project import ProjectQuerySet
+
+    return ProjectQuerySet
+
+
 class BuildType(object):
+    __slots__ = (
+        'id', 'name', 'description', 'href', 'web_url', 'project_id',
+        'project_name', 'paused', 'template_flag', 'teamcity',
+        'build_type_query_set', '_data_dict', '_related')
+
     def __init__(self, id, name, description, href, web_url,
                  project_id, project_name,
                  paused, template_flag,
@@ -51,10 +64,8 @@ class BuildType(object):
 
     @property
     def project(self):
-        from .project import ProjectQuerySet
-
-        teamcity = self.teamcity
-        return ProjectQuerySet(teamcity).get(id=self.project_id)
+        return get_related(
+            self, 'project', _project_query_set(), self.project_id)
 
     @property
     def parameters_dict(self):
@@ -78,6 +89,7 @@ class BuildType(object):
                      'Accept': 'text/plain'},
             data='true' if bool else 'false')
         raise_on_status(res)
+        discard_entity(self)
 
     def reset_build_counter(self, counter):
         url = ''.join([
@@ -90,6 +102,7 @@ class BuildType(object):
                      'Accept': 'text/plain'},
             data=str(counter))
         raise_on_status(res)
+        discard_entity(self)
 
     def get_triggers(self):
         url = ''.join([
@@ -127,6 +140,7 @@ class BuildType(object):
             headers={'Content-Type': 'application/json'},
             data=trigger_data)
         raise_on_status(res)
+        discard_entity(self)
 
     def set_trigger_property(self, trigger_locator, property_name, property_value):
         trigger_data = self.get_trigger(trigger_locator)
@@ -177,37 +191,41 @@ class BuildType(object):
                      'Accept': 'text/plain'},
             data=str(parameter_value))
         raise_on_status(res)
+        discard_entity(self)
 
     def delete(self):
         url = self.teamcity.base_base_url + self.href
         res = self.teamcity.session.delete(url)
         raise_on_status(res)
+        discard_entity(self)
 
 
 class BuildTypeQuerySet(QuerySet):
     uri = '/app/rest/buildTypes/'
     _entity_factory = BuildType
+    _data_key = 'buildType'
+    _cacheable = True
+    _relations = {
+        'project': Relation('project', 'project_id', _project_query_set),
+    }
 
     def filter(self, id=None, name=None,
                project_id=None, affected_project_id=None,
                paused=None, template_id=None, template_flag=None):
+        query_set = self._clone()
         if id is not None:
-            self._add_pred('id', id)
+            query_set._add_pred('id', id)
         if name is not None:
-            self._add_pred('name', name)
+            query_set._add_pred('name', name)
         if project_id is not None:
-            self._add_pred('project', '(id:%s)' % project_id)
+            query_set._add_pred('project', '(id:%s)' % project_id)
         if affected_project_id is not None:
-            self._add_pred('affectedProject',
-                           '(id:%s)' % affected_project_id)
+            query_set._add_pred('affectedProject',
+                                '(id:%s)' % affected_project_id)
         if paused is not None:
-            self._add_pred('paused', paused)
+            query_set._add_pred('paused', paused)
         if template_id is not None:
-            self._add_pred('template', '(id:%s)' % template_id)
+            query_set._add_pred('template', '(id:%s)' % template_id)
         if template_flag is not None:
-            self._add_pred('templateFlag', template_flag)
-        return self
-
-    def __iter__(self):
-        return (BuildType.from_dict(d, self)
-                for d in self._data()['buildType'])
+            query_set._add_pred('templateFlag', template_flag)
+        return query_set
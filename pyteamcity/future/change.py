@@ -3,6 +3,10 @@ from .core.utils import parse_date_string
 
 
 class Change(object):
+    __slots__ = (
+        'id', 'version', 'username', 'date_str', 'href', 'web_url',
+        'query_set', '_data_dict', '_related')
+
     def __init__(self, id,
                  version, username, date_str,
                  href, web_url,
@@ -46,34 +50,33 @@ class Change(object):
 class ChangeQuerySet(QuerySet):
     uri = '/app/rest/changes/'
     _entity_factory = Change
+    _data_key = 'change'
+    _paged = True
 
     def filter(self,
                id=None,
                project=None, build_type=None, build=None,
                vcs_root=None, username=None, version=None,
                start=None, count=None, lookup_limit=None):
+        query_set = self._clone()
         if id is not None:
-            self._add_pred('id', id)
+            query_set._add_pred('id', id)
         if project is not None:
-            self._add_pred('project', project)
+            query_set._add_pred('project', project)
         if build_type is not None:
-            self._add_pred('buildType', build_type)
+            query_set._add_pred('buildType', build_type)
         if build is not None:
-            self._add_pred('build', build)
+            query_set._add_pred('build', build)
         if vcs_root is not None:
-            self._add_pred('vcsRoot', vcs_root)
+            query_set._add_pred('vcsRoot', vcs_root)
         if username is not None:
-            self._add_pred('username', username)
+            query_set._add_pred('username', username)
         if version is not None:
-            self._add_pred('version', version)
+            query_set._add_pred('version', version)
         if start is not None:
-            self._add_pred('start', start)
+            query_set._add_pred('start', start)
         if count is not None:
-            self._add_pred('count', count)
+            query_set._add_pred('count', count)
         if lookup_limit is not None:
-            self._add_pred('lookupLimit', lookup_limit)
-        return self
-
-    def __iter__(self):
-        return (self.__class__._entity_factory.from_dict(d, self)
-                for d in self._data()['change'])
+            query_set._add_pred('lookupLimit', lookup_limit)
+        return query_set
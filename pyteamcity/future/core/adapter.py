@@ -0,0 +1,94 @@
+import threading
+
+import requests
+from requests.adapters import BaseAdapter, HTTPAdapter
+
+
+class TeamCityAdapter(HTTPAdapter):
+    """
+    Transport adapter mounted on `TeamCity.session` to add client-wide
+    behaviour underneath every request made through it.
+
+    `max_concurrency` caps the number of requests in flight at once,
+    across every thread using the session, including the download of
+    their bodies. Requests made with `stream=True` only hold their slot
+    until the response headers arrive, as their body is read later by
+    the caller. `retry` is a `RetryPolicy` for failed requests.
+
+    Functions in `request_hooks` are called with every request before it
+    is sent, and functions in `response_hooks` with every response.
+    Requests are sent by the `transport` adapter if given, such as a
+    `HARReplayAdapter`, instead of over the network. Other keyword
+    arguments, such as `pool_connections` and `pool_maxsize`, configure
+    the underlying `HTTPAdapter`.
+    """
+
+    def __init__(self, http_cache=None, max_concurrency=None, retry=None,
+                 transport=None, **kwargs):
+        self.http_cache = http_cache
+        self.transport = transport
+        self.retry = retry
+        self.request_hooks = []
+        self.response_hooks = []
+        self.max_concurrency = max_concurrency
+        self._semaphore = None
+        if max_concurrency is not None:
+            self._semaphore = threading.BoundedSemaphore(max_concurrency)
+        super(TeamCityAdapter, self).__init__(**kwargs)
+
+    def _send_once(self, request, **kwargs):
+        if self.transport is not None:
+            send = self.transport.send
+        else:
+            send = super(TeamCityAdapter, self).send
+        if self._semaphore is None:
+            return send(request, **kwargs)
+        with self._semaphore:
+            response = send(request, **kwargs)
+            if not kwargs.get('stream'):
+                response.content
+            return response
+
+    def _send(self, request, **kwargs):
+        if self.retry is not None:
+            return self.retry.send(self._send_once, request, **kwargs)
+        return self._send_once(request, **kwargs)
+
+    def send(self, request, **kwargs):
+        for hook in self.request_hooks:
+            hook(request)
+        if self.http_cache is not None:
+            response = self.http_cache.send(self._send, request, **kwargs)
+        else:
+            response = self._send(request, **kwargs)
+        if self.response_hooks:
+            if not kwargs.get('stream'):
+                # Read now rather than by the session, for hooks to see it
+                response.content
+            for hook in self.response_hooks:
+                hook(response)
+        return response
+
+
+class MountedAdapters(BaseAdapter):
+    """
+    Transport sending requests through the adapters that were mounted on
+    a session before a `TeamCityAdapter` took their place, keyed by their
+    prefix, so their retries, certificates or pools are kept.
+    """
+
+    def __init__(self, adapters):
+        super(MountedAdapters, self).__init__()
+        self.adapters = adapters
+
+    def send(self, request, **kwargs):
+        url = request.url.lower()
+        for prefix, adapter in self.adapters.items():
+            if url.startswith(prefix):
+                return adapter.send(request, **kwargs)
+        raise requests.exceptions.InvalidSchema(
+            'No connection adapters were found for %r' % request.url)
+
+    def close(self):
+        for adapter in self.adapters.values():
+            adapter.close()
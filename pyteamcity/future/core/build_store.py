@@ -0,0 +1,84 @@
+import json
+import sqlite3
+import threading
+import time
+
+
+class BuildStore(object):
+    """
+    SQLite-backed store of data about finished builds, which never changes.
+
+    Entries are the decoded JSON of a response, keyed by build id and a
+    `kind` naming the resource (`'build'`, `'resulting-properties'`,
+    ...). Once the stored JSON exceeds `max_size` bytes, the least
+    recently read entries are evicted. Pass one to
+    `TeamCity(build_store=...)` to use it.
+    """
+
+    def __init__(self, path, max_size=256 * 1024 * 1024):
+        self.path = path
+        self.max_size = max_size
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        with self._connection:
+            self._connection.execute(
+                'CREATE TABLE IF NOT EXISTS entries ('
+                ' build_id TEXT NOT NULL,'
+                ' kind TEXT NOT NULL,'
+                ' data TEXT NOT NULL,'
+                ' size INTEGER NOT NULL,'
+                ' accessed REAL NOT NULL,'
+                ' PRIMARY KEY (build_id, kind))')
+            self._connection.execute(
+                'CREATE INDEX IF NOT EXISTS entries_accessed'
+                ' ON entries (accessed)')
+
+    def get(self, build_id, kind='build'):
+        key = (str(build_id), kind)
+        with self._lock, self._connection:
+            row = self._connection.execute(
+                'SELECT data FROM entries WHERE build_id = ? AND kind = ?',
+                key).fetchone()
+            if row is None:
+                return None
+            self._connection.execute(
+                'UPDATE entries SET accessed = ?'
+                ' WHERE build_id = ? AND kind = ?',
+                (time.time(),) + key)
+        return json.loads(row[0])
+
+    def set(self, build_id, kind, data):
+        data = json.dumps(data)
+        with self._lock, self._connection:
+            self._connection.execute(
+                'INSERT OR REPLACE INTO entries'
+                ' (build_id, kind, data, size, accessed)'
+                ' VALUES (?, ?, ?, ?, ?)',
+                (str(build_id), kind, data, len(data), time.time()))
+            self._evict()
+
+    def _evict(self):
+        total, = self._connection.execute(
+            'SELECT COALESCE(SUM(size), 0) FROM entries').fetchone()
+        if total <= self.max_size:
+            return
+        evicted = []
+        rows = self._connection.execute(
+            'SELECT rowid, size FROM entries ORDER BY accessed')
+        for rowid, size in rows:
+            if total <= self.max_size:
+                break
+            evicted.append((rowid,))
+            total -= size
+        self._connection.executemany(
+            'DELETE FROM entries WHERE rowid = ?', evicted)
+
+    def __len__(self):
+        with self._lock:
+            count, = self._connection.execute(
+                'SELECT COUNT(*) FROM entries').fetchone()
+        return count
+
+    def close(self):
+        with self._lock:
+            self._connection.close()
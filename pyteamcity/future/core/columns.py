@@ -0,0 +1,190 @@
+import collections
+import datetime
+import itertools
+
+from .utils import parse_date_string
+
+DATE_FIELDS = frozenset([
+    'date', 'finishDate', 'lastLogin', 'modificationTime', 'queuedDate',
+    'startDate'])
+CATEGORICAL_FIELDS = frozenset([
+    'branchName', 'buildTypeId', 'projectId', 'state', 'status', 'username'])
+
+_DIGIT_COLUMNS = list(range(8)) + list(range(9, 15)) + list(range(16, 20))
+
+Categorical = collections.namedtuple('Categorical', ['codes', 'categories'])
+
+
+def import_numpy():
+    try:
+        import numpy
+    except ImportError:
+        raise ImportError(
+            'to_columns() requires numpy; install pyteamcity[numpy]')
+    return numpy
+
+
+def import_pandas():
+    try:
+        import pandas
+    except ImportError:
+        raise ImportError(
+            'to_dataframe() requires pandas; install pyteamcity[pandas]')
+    return pandas
+
+
+def _utc(date_string):
+    date = parse_date_string(date_string)
+    if date.tzinfo is not None:
+        date = (date - date.utcoffset()).replace(tzinfo=None)
+    return date
+
+
+def _dates(numpy, values):
+    """
+    Return `values`, TeamCity date strings or None, as `datetime64[s]` in
+    UTC. Strings of the usual `20160101T120000+0000` form are converted
+    with array arithmetic on their digits, others with `parse_date_string`.
+    """
+    dates = numpy.full(len(values), 'NaT', dtype='datetime64[s]')
+    index, others = [], []
+    for i, value in enumerate(values):
+        if value is None:
+            continue
+        if len(value) == 20 and value[8] == 'T' and value[15] in '+-':
+            index.append(i)
+        else:
+            others.append(i)
+    if index:
+        index = numpy.array(index)
+        # Other characters become '?' and fail the digit check below
+        raw = numpy.frombuffer(
+            ''.join(values[i] for i in index).encode('ascii', 'replace'),
+            dtype=numpy.uint8).reshape(-1, 20)
+        digits = raw.astype(numpy.int64) - ord('0')
+        columns = digits[:, _DIGIT_COLUMNS]
+        valid = ((columns >= 0) & (columns <= 9)).all(axis=1)
+
+        def number(start, stop):
+            result = 0
+            for column in range(start, stop):
+                result = result * 10 + digits[:, column]
+            return result
+
+        month, day = number(4, 6), number(6, 8)
+        hour, minute, second = number(9, 11), number(11, 13), number(13, 15)
+        offset_hour, offset_minute = number(16, 18), number(18, 20)
+        months = (
+            (number(0, 4) - 1970).astype('datetime64[Y]') +
+            (month - 1).astype('timedelta64[M]'))
+        month_days = (
+            (months + 1).astype('datetime64[D]') -
+            months.astype('datetime64[D]')).astype(numpy.int64)
+        # Out of range fields would roll over into the next month, day, ...
+        # so such dates are left for `parse_date_string` to reject
+        valid &= (
+            (month >= 1) & (month <= 12) & (day >= 1) & (day <= month_days) &
+            (hour < 24) & (minute < 60) & (second < 60) &
+            (offset_hour < 24) & (offset_minute < 60))
+        days = months.astype('datetime64[D]') + (day - 1).astype(
+            'timedelta64[D]')
+        sign = numpy.where(raw[:, 15] == ord('-'), -1, 1)
+        seconds = (
+            hour * 3600 + minute * 60 + second -
+            sign * (offset_hour * 3600 + offset_minute * 60))
+        dates[index[valid]] = (
+            days.astype('datetime64[s]') +
+            seconds.astype('timedelta64[s]'))[valid]
+        others.extend(index[~valid].tolist())
+    for i in others:
+        dates[i] = _utc(values[i])
+    return dates
+
+
+def _array(numpy, values):
+    types = set(type(value) for value in values)
+    if types <= {int} and types:
+        return numpy.array(values, dtype=numpy.int64)
+    if types <= {int, float, type(None)} and types - {type(None)}:
+        return numpy.array(
+            [numpy.nan if value is None else value for value in values],
+            dtype=numpy.float64)
+    if types == {bool}:
+        return numpy.array(values, dtype=bool)
+    array = numpy.empty(len(values), dtype=object)
+    array[:] = values
+    return array
+
+
+class ColumnBuilder(object):
+    """
+    Collects the JSON `fields` of pages of entities into numpy columns.
+
+    Each page is converted as it is added, so no entity objects are
+    built. Date fields become `datetime64[s]` in UTC (`NaT` if missing),
+    categorical fields a `Categorical` of `int32` codes (-1 if missing)
+    and categories, integer fields `int64` (`float64` with `nan` if some
+    are missing), and other fields `object` arrays.
+    """
+
+    def __init__(self, fields, numpy):
+        self.fields = list(fields)
+        self.numpy = numpy
+        self._chunks = dict((field, []) for field in self.fields)
+        self._categories = dict(
+            (field, {}) for field in self.fields
+            if field in CATEGORICAL_FIELDS)
+
+    def add_page(self, items):
+        for field in self.fields:
+            values = [d.get(field) for d in items]
+            if field in self._categories:
+                values = self._codes(self._categories[field], values)
+            elif field in DATE_FIELDS:
+                values = _dates(self.numpy, values)
+            self._chunks[field].append(values)
+
+    def _codes(self, categories, values):
+        codes = self.numpy.empty(len(values), dtype=self.numpy.int32)
+        for i, value in enumerate(values):
+            if value is None:
+                codes[i] = -1
+            else:
+                codes[i] = categories.setdefault(value, len(categories))
+        return codes
+
+    def columns(self):
+        numpy = self.numpy
+        columns = collections.OrderedDict()
+        for field in self.fields:
+            chunks = self._chunks[field]
+            if field in self._categories:
+                categories = sorted(
+                    self._categories[field],
+                    key=self._categories[field].get)
+                codes = numpy.concatenate(chunks) if chunks else numpy.empty(
+                    0, dtype=numpy.int32)
+                columns[field] = Categorical(codes, categories)
+            elif field in DATE_FIELDS:
+                columns[field] = numpy.concatenate(chunks) if chunks else \
+                    numpy.empty(0, dtype='datetime64[s]')
+            else:
+                columns[field] = _array(
+                    numpy, list(itertools.chain.from_iterable(chunks)))
+        return columns
+
+
+def columns_to_dataframe(columns):
+    """Return a pandas DataFrame of `ColumnBuilder.columns()`"""
+    pandas = import_pandas()
+    data = collections.OrderedDict()
+    for field, column in columns.items():
+        if isinstance(column, Categorical):
+            data[field] = pandas.Categorical.from_codes(
+                column.codes, categories=column.categories)
+        elif field in DATE_FIELDS:
+            data[field] = pandas.Series(column).dt.tz_localize(
+                datetime.timezone.utc)
+        else:
+            data[field] = column
+    return pandas.DataFrame(data, columns=list(columns))
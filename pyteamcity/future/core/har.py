@@ -0,0 +1,197 @@
+import atexit
+import base64
+import collections
+import datetime
+import json
+import tempfile
+import threading
+
+import requests
+from requests.adapters import BaseAdapter
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+from six.moves.urllib.parse import parse_qsl, urlsplit
+
+REDACTED_HEADERS = frozenset(['authorization', 'cookie', 'set-cookie'])
+
+
+def _version():
+    try:
+        from importlib import metadata
+    except ImportError:  # Python < 3.8
+        try:
+            import pkg_resources
+            return pkg_resources.get_distribution('pyteamcity').version
+        except Exception:
+            return ''
+    try:
+        return metadata.version('pyteamcity')
+    except metadata.PackageNotFoundError:
+        return ''
+
+
+def _headers(headers):
+    return [
+        {'name': name,
+         'value': '[redacted]' if name.lower() in REDACTED_HEADERS else value}
+        for name, value in headers.items()]
+
+
+def _content(body, mime_type):
+    content = {'size': len(body), 'mimeType': mime_type}
+    try:
+        content['text'] = body.decode('utf-8')
+    except UnicodeDecodeError:
+        content['text'] = base64.b64encode(body).decode('ascii')
+        content['encoding'] = 'base64'
+    return content
+
+
+class HARRecorder(object):
+    """
+    Records requests and responses in HTTP Archive (HAR 1.2) format.
+
+    Entries are spooled to a temporary file as they are recorded, so
+    memory does not grow with the length of the session, and written to
+    `path` by `save()`, which also runs at exit. `count` is the number of
+    entries recorded. Credential headers are redacted. Streamed response
+    bodies are read in full to record them. Use `TeamCity(record_to=path)`
+    to record all requests of a client.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.count = 0
+        self._spool = tempfile.TemporaryFile(mode='w+', encoding='utf-8')
+        self._lock = threading.Lock()
+        atexit.register(self.save)
+
+    def on_response(self, response):
+        request = response.request
+        started = datetime.datetime.now(datetime.timezone.utc) - response.elapsed
+        request_body = request.body or b''
+        if not isinstance(request_body, bytes):
+            request_body = str(request_body).encode('utf-8')
+        entry = {
+            'startedDateTime': started.isoformat(),
+            'time': response.elapsed.total_seconds() * 1000,
+            'request': {
+                'method': request.method,
+                'url': request.url,
+                'httpVersion': 'HTTP/1.1',
+                'headers': _headers(request.headers),
+                'queryString': [
+                    {'name': name, 'value': value}
+                    for name, value in parse_qsl(urlsplit(request.url).query)],
+                'cookies': [],
+                'headersSize': -1,
+                'bodySize': len(request_body),
+            },
+            'response': {
+                'status': response.status_code,
+                'statusText': response.reason or '',
+                'httpVersion': 'HTTP/1.1',
+                'headers': _headers(response.headers),
+                'cookies': [],
+                'content': _content(
+                    response.content or b'',
+                    response.headers.get('Content-Type', '')),
+                'redirectURL': response.headers.get('Location', ''),
+                'headersSize': -1,
+                'bodySize': len(response.content or b''),
+            },
+            'cache': {},
+            'timings': {
+                'send': 0,
+                'wait': response.elapsed.total_seconds() * 1000,
+                'receive': 0,
+            },
+        }
+        if request_body:
+            entry['request']['postData'] = {
+                'mimeType': request.headers.get('Content-Type', ''),
+                'text': request_body.decode('utf-8', 'replace'),
+            }
+        line = json.dumps(entry) + '\n'
+        with self._lock:
+            self._spool.write(line)
+            self.count += 1
+
+    def save(self):
+        creator = {'name': 'pyteamcity', 'version': _version()}
+        with self._lock:
+            if self._spool.closed:
+                return
+            with open(self.path, 'w') as f:
+                f.write('{"log": {"version": "1.2", "creator": %s, '
+                        '"entries": [' % json.dumps(creator))
+                self._spool.seek(0)
+                for i, line in enumerate(self._spool):
+                    f.write((',\n' if i else '\n') + line.rstrip('\n'))
+                f.write('\n]}}\n')
+
+    def close(self):
+        self.save()
+        atexit.unregister(self.save)
+        with self._lock:
+            self._spool.close()
+
+
+class HARReplayAdapter(BaseAdapter):
+    """
+    Transport serving responses from a HAR file instead of the network.
+
+    Requests are matched by method and URL. Several entries for the same
+    request are served in the order recorded, then the last one is
+    repeated. Unmatched requests raise `requests.ConnectionError`.
+    """
+
+    def __init__(self, path):
+        super(HARReplayAdapter, self).__init__()
+        self.path = path
+        with open(path) as f:
+            entries = json.load(f)['log']['entries']
+        self._entries = collections.defaultdict(list)
+        for entry in entries:
+            key = (entry['request']['method'], entry['request']['url'])
+            self._entries[key].append(entry)
+        self._served = collections.Counter()
+        self._lock = threading.Lock()
+
+    def send(self, request, **kwargs):
+        key = (request.method, request.url)
+        with self._lock:
+            entries = self._entries.get(key)
+            if not entries:
+                raise requests.ConnectionError(
+                    'No recorded response for %s %s' % key, request=request)
+            entry = entries[min(self._served[key], len(entries) - 1)]
+            self._served[key] += 1
+        return self._build_response(entry, request)
+
+    @staticmethod
+    def _build_response(entry, request):
+        recorded = entry['response']
+        content = recorded['content']
+        body = content.get('text', '')
+        if content.get('encoding') == 'base64':
+            body = base64.b64decode(body)
+        else:
+            body = body.encode('utf-8')
+
+        response = requests.Response()
+        response.status_code = recorded['status']
+        response.reason = recorded['statusText']
+        response.headers = CaseInsensitiveDict(
+            (header['name'], header['value'])
+            for header in recorded['headers'])
+        response.encoding = get_encoding_from_headers(response.headers)
+        response._content = body
+        response._content_consumed = True
+        response.url = request.url
+        response.request = request
+        response.elapsed = datetime.timedelta(milliseconds=entry['time'])
+        return response
+
+    def close(self):
+        pass
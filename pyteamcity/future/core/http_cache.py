@@ -0,0 +1,137 @@
+import base64
+import hashlib
+import json
+import os
+import threading
+
+import requests
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+
+class MemoryCacheStore(object):
+    def __init__(self):
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            return self._entries.get(key)
+
+    def set(self, key, entry):
+        with self._lock:
+            self._entries[key] = entry
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class FileCacheStore(object):
+    """Keeps one JSON file per cached response in `directory`"""
+
+    def __init__(self, directory):
+        self.directory = directory
+        if not os.path.isdir(directory):
+            os.makedirs(directory)
+
+    def _path(self, key):
+        name = hashlib.sha256(key.encode('utf-8')).hexdigest()
+        return os.path.join(self.directory, name + '.json')
+
+    def get(self, key):
+        try:
+            with open(self._path(key)) as f:
+                entry = json.load(f)
+        except (IOError, OSError, ValueError):
+            return None
+        entry['body'] = base64.b64decode(entry['body'])
+        return entry
+
+    def set(self, key, entry):
+        entry = dict(entry, body=base64.b64encode(entry['body']).decode('ascii'))
+        path = self._path(key)
+        tmp_path = '%s.%d.%d' % (path, os.getpid(), threading.get_ident())
+        with open(tmp_path, 'w') as f:
+            json.dump(entry, f)
+        os.replace(tmp_path, path)
+
+    def clear(self):
+        for name in os.listdir(self.directory):
+            if name.endswith('.json'):
+                os.remove(os.path.join(self.directory, name))
+
+
+class HTTPCache(object):
+    """
+    Conditional GET cache for responses carrying an `ETag` or
+    `Last-Modified` validator.
+
+    Cached validators are sent back with later GETs of the same URL, and a
+    `304 Not Modified` reply is answered with the stored body. `hits`
+    counts requests served that way, `misses` every other GET.
+    """
+
+    def __init__(self, store=None):
+        self.store = store if store is not None else MemoryCacheStore()
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(request):
+        return '%s %s %s' % (
+            request.method, request.url, request.headers.get('Accept'))
+
+    def _count(self, hit):
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def send(self, send, request, **kwargs):
+        """Send `request` with the `send` function of a transport adapter"""
+        if request.method != 'GET' or kwargs.get('stream'):
+            return send(request, **kwargs)
+
+        key = self._key(request)
+        entry = self.store.get(key)
+        if entry is not None:
+            if entry.get('etag'):
+                request.headers['If-None-Match'] = entry['etag']
+            if entry.get('last_modified'):
+                request.headers['If-Modified-Since'] = entry['last_modified']
+
+        response = send(request, **kwargs)
+
+        if response.status_code == 304 and entry is not None:
+            self._count(hit=True)
+            return self._cached_response(entry, request, response)
+
+        self._count(hit=False)
+        etag = response.headers.get('ETag')
+        last_modified = response.headers.get('Last-Modified')
+        if response.status_code == 200 and (etag or last_modified):
+            self.store.set(key, {
+                'etag': etag,
+                'last_modified': last_modified,
+                'headers': dict(response.headers),
+                'body': response.content,
+            })
+        return response
+
+    @staticmethod
+    def _cached_response(entry, request, not_modified):
+        response = requests.Response()
+        response.status_code = 200
+        response.reason = 'OK'
+        response.headers = CaseInsensitiveDict(entry['headers'])
+        response.encoding = get_encoding_from_headers(response.headers)
+        response._content = entry['body']
+        response._content_consumed = True
+        response.url = request.url
+        response.request = request
+        response.elapsed = not_modified.elapsed
+        response.connection = not_modified.connection
+        return response
@@ -0,0 +1,66 @@
+import collections
+import threading
+import time
+
+
+class IdentityMap(object):
+    """
+    Thread-safe cache of entities keyed by entity type and id.
+
+    Entries expire `ttl` seconds after being added, and once more than
+    `max_size` entries are held the least recently used ones are evicted.
+    Pass one to `TeamCity(identity_map=...)` to have lookups by id of
+    slow-changing entities (projects, build types, agent pools, users and
+    VCS roots) served from it.
+    """
+
+    def __init__(self, ttl=300, max_size=10000, clock=time.monotonic):
+        self.ttl = ttl
+        self.max_size = max_size
+        self.clock = clock
+        self.hits = 0
+        self.misses = 0
+        self._entries = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, entity_type, id):
+        key = (entity_type, str(id))
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > self.clock():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return None
+
+    def add(self, entity_type, id, entity):
+        key = (entity_type, str(id))
+        with self._lock:
+            self._entries[key] = (self.clock() + self.ttl, entity)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def discard(self, entity_type, id):
+        with self._lock:
+            self._entries.pop((entity_type, str(id)), None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+def discard_entity(entity):
+    """
+    Drop `entity` from its client's identity map, if any, once it has been
+    changed or deleted on the server.
+    """
+    identity_map = getattr(entity.teamcity, 'identity_map', None)
+    if identity_map is not None:
+        identity_map.discard(entity.__class__.__name__, entity.id)
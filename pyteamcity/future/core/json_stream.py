@@ -0,0 +1,110 @@
+import codecs
+import json
+
+_decoder = json.JSONDecoder()
+_WHITESPACE = ' \t\n\r'
+
+
+class _Reader(object):
+    """Decodes JSON values one at a time from an iterable of byte chunks"""
+
+    def __init__(self, chunks):
+        self._chunks = iter(chunks)
+        self._decode = codecs.getincrementaldecoder('utf-8')().decode
+        self.buffer = ''
+        self.pos = 0
+
+    def _read(self, size=1):
+        """
+        Append at least `size` characters from the next chunks to the
+        buffer, or what is left of them, False if nothing was left.
+        """
+        texts = []
+        length = 0
+        for chunk in self._chunks:
+            text = self._decode(chunk)
+            if text:
+                texts.append(text)
+                length += len(text)
+                if length >= size:
+                    break
+        if not texts:
+            return False
+        # Text before `pos` has been parsed and is dropped
+        self.buffer = self.buffer[self.pos:] + ''.join(texts)
+        self.pos = 0
+        return True
+
+    def _error(self, message):
+        return json.JSONDecodeError(message, self.buffer, self.pos)
+
+    def peek(self):
+        """Skip whitespace and return the next character, '' at the end"""
+        while True:
+            while (self.pos < len(self.buffer) and
+                   self.buffer[self.pos] in _WHITESPACE):
+                self.pos += 1
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self._read():
+                return ''
+
+    def expect(self, chars):
+        """Consume and return the next character, which must be in `chars`"""
+        char = self.peek()
+        if not char or char not in chars:
+            raise self._error('Expecting one of %r' % chars)
+        self.pos += 1
+        return char
+
+    def value(self):
+        self.peek()
+        while True:
+            try:
+                value, end = _decoder.raw_decode(self.buffer, self.pos)
+            except ValueError:
+                # Values cut off by the end of the buffer do not decode.
+                # Reading at least as much again as was tried keeps a large
+                # value from being decoded again for every chunk.
+                if not self._read(len(self.buffer) - self.pos):
+                    raise
+                continue
+            # A number at the end of the buffer may go on in the next chunk
+            if end == len(self.buffer) and self._read():
+                continue
+            self.pos = end
+            return value
+
+
+def iter_array(chunks, key, members):
+    """
+    Incrementally parse the JSON object read from `chunks`, an iterable of
+    bytes, yielding the elements of its array member `key` one at a time.
+
+    Only one element is decoded at a time, so memory does not grow with
+    the length of the array. The object's other members are stored into
+    the `members` dict as they are parsed, so all of them are there once
+    the generator is exhausted.
+    """
+    reader = _Reader(chunks)
+    reader.expect('{')
+    if reader.peek() == '}':
+        return
+    while True:
+        name = reader.value()
+        if not isinstance(name, str):
+            raise reader._error('Expecting property name')
+        reader.expect(':')
+        if name == key and reader.peek() == '[':
+            reader.pos += 1
+            if reader.peek() == ']':
+                reader.pos += 1
+            else:
+                while True:
+                    yield reader.value()
+                    if reader.expect(',]') == ']':
+                        break
+        else:
+            members[name] = reader.value()
+        if reader.expect(',}') == '}':
+            break
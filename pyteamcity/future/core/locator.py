@@ -8,5 +8,21 @@ class Locator(object):
         # @todo: Check for invalid dims
         self._preds.append((dim, value))
 
+    def set_pred(self, dim, value):
+        """Replace every existing value of `dim` with `value`"""
+        self._preds = [p for p in self._preds if p[0] != dim]
+        self._preds.append((dim, value))
+
+    def get(self, dim, default=None):
+        for pred_dim, value in self._preds:
+            if pred_dim == dim:
+                return value
+        return default
+
+    def copy(self):
+        locator = self.__class__()
+        locator._preds = list(self._preds)
+        return locator
+
     def __str__(self):
         return ','.join(['%s:%s' % p for p in self._preds])
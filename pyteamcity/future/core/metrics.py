@@ -0,0 +1,151 @@
+import threading
+import time
+
+from six.moves.urllib.parse import parse_qsl, urlsplit
+
+ARTIFACT_RESOURCES = frozenset(
+    ['archived', 'children', 'content', 'files', 'metadata'])
+
+
+def _split_locator(locator):
+    """Split `locator` into its top-level `dim:value` predicates"""
+    preds = []
+    depth = 0
+    start = 0
+    for i, char in enumerate(locator):
+        if char == '(':
+            depth += 1
+        elif char == ')':
+            depth -= 1
+        elif char == ',' and depth == 0:
+            preds.append(locator[start:i])
+            start = i + 1
+    preds.append(locator[start:])
+    return preds
+
+
+def _locator_template(locator):
+    return ','.join(
+        pred.split(':', 1)[0] + ':*' if ':' in pred else '*'
+        for pred in _split_locator(locator))
+
+
+def url_template(url):
+    """
+    Return the shape of `url` with ids, locator values and artifact paths
+    replaced by `*`, e.g. `/app/rest/builds/id:*/artifacts/content/*` for
+    any build artifact. `fields=` is left out.
+    """
+    parts = urlsplit(url)
+    segments = parts.path.split('/')
+    if len(segments) > 1 and segments[1] in ('guestAuth', 'httpAuth'):
+        del segments[1]
+
+    template = []
+    in_artifacts = False
+    for segment in segments:
+        if in_artifacts and template[-1] in ARTIFACT_RESOURCES:
+            template.append('*')
+            break
+        if segment == 'artifacts':
+            in_artifacts = True
+        if ':' in segment:
+            segment = _locator_template(segment)
+        elif segment.isdigit():
+            segment = '*'
+        template.append(segment)
+
+    template = '/'.join(template)
+    for name, value in parse_qsl(parts.query):
+        if name == 'locator':
+            template += '?locator=' + _locator_template(value)
+    return template
+
+
+class EndpointMetrics(object):
+    def __init__(self, buckets):
+        self.count = 0
+        self.errors = 0
+        self.total_latency = 0.0
+        self.latency_histogram = [0] * (len(buckets) + 1)
+        self.response_bytes = 0
+        self.json_decodes = 0
+        self.json_decode_time = 0.0
+
+    def as_dict(self):
+        return dict(vars(self), latency_histogram=list(self.latency_histogram))
+
+
+class MetricsCollector(object):
+    """
+    Records per-endpoint request counts, latencies, response sizes and
+    JSON decode times.
+
+    Endpoints are `'<method> <url template>'`, see `url_template()`.
+    `buckets` are the upper bounds, in seconds, of the latency histogram,
+    whose last bucket counts slower requests. Pass one to
+    `TeamCity(metrics=...)` to collect metrics of all its requests.
+    """
+
+    buckets = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+    def __init__(self, buckets=None, clock=time.perf_counter):
+        if buckets is not None:
+            self.buckets = tuple(buckets)
+        self.clock = clock
+        self._endpoints = {}
+        self._lock = threading.Lock()
+
+    def attach(self, teamcity):
+        teamcity.on_response(self.on_response)
+
+    def _endpoint(self, request):
+        key = '%s %s' % (request.method, url_template(request.url))
+        endpoint = self._endpoints.get(key)
+        if endpoint is None:
+            endpoint = self._endpoints[key] = EndpointMetrics(self.buckets)
+        return endpoint
+
+    def on_response(self, response):
+        latency = response.elapsed.total_seconds()
+        if response._content_consumed:
+            size = len(response.content or b'')
+        else:
+            size = int(response.headers.get('Content-Length', 0))
+        bucket = len(self.buckets)
+        for i, bound in enumerate(self.buckets):
+            if latency <= bound:
+                bucket = i
+                break
+        with self._lock:
+            endpoint = self._endpoint(response.request)
+            endpoint.count += 1
+            endpoint.errors += response.status_code >= 400
+            endpoint.total_latency += latency
+            endpoint.latency_histogram[bucket] += 1
+            endpoint.response_bytes += size
+
+        decode = response.json
+
+        def json(**kwargs):
+            start = self.clock()
+            try:
+                return decode(**kwargs)
+            finally:
+                elapsed = self.clock() - start
+                with self._lock:
+                    endpoint.json_decodes += 1
+                    endpoint.json_decode_time += elapsed
+
+        response.json = json
+
+    def snapshot(self):
+        """Return the metrics recorded so far, as a dict by endpoint"""
+        with self._lock:
+            return dict(
+                (key, endpoint.as_dict())
+                for key, endpoint in self._endpoints.items())
+
+    def reset(self):
+        with self._lock:
+            self._endpoints.clear()
@@ -0,0 +1,63 @@
+import collections
+import contextlib
+import threading
+import warnings
+
+from .. import exceptions
+from .metrics import url_template
+
+_local = threading.local()
+
+
+@contextlib.contextmanager
+def request_origin(name):
+    """Attribute requests made by this thread in the block to `name`"""
+    previous = getattr(_local, 'origin', None)
+    _local.origin = name
+    try:
+        yield
+    finally:
+        _local.origin = previous
+
+
+class NPlusOneDetector(object):
+    """
+    Counts requests by method and URL template (see `url_template()`) and
+    warns with `NPlusOneWarning`, or raises `NPlusOneError` if `action` is
+    `'raise'`, once more than `threshold` requests have the same shape.
+
+    Requests for pages of results (with a `start` locator dimension) are
+    not counted. Use `TeamCity.detect_n_plus_one()` to install one.
+    """
+
+    def __init__(self, threshold=10, action='warn'):
+        if action not in ('warn', 'raise'):
+            raise ValueError("action must be 'warn' or 'raise'")
+        self.threshold = threshold
+        self.action = action
+        self.counts = collections.Counter()
+        self.origins = collections.defaultdict(collections.Counter)
+        self._lock = threading.Lock()
+
+    def on_request(self, request):
+        template = url_template(request.url)
+        if 'start:*' in template:
+            return
+        key = '%s %s' % (request.method, template)
+        origin = getattr(_local, 'origin', None)
+        with self._lock:
+            self.counts[key] += 1
+            count = self.counts[key]
+            if origin is not None:
+                self.origins[key][origin] += 1
+        if count == self.threshold + 1:
+            self._report(key, count, origin)
+
+    def _report(self, key, count, origin):
+        message = '%d %s requests' % (count, key)
+        if origin is not None:
+            message += ' made by %s' % origin
+        message += ', more than the threshold of %d' % self.threshold
+        if self.action == 'raise':
+            raise exceptions.NPlusOneError(message)
+        warnings.warn(message, exceptions.NPlusOneWarning, stacklevel=2)
@@ -0,0 +1,52 @@
+import threading
+
+from six.moves import queue
+
+_DONE = object()
+
+
+def prefetched(iterable, depth):
+    """
+    Yield the items of `iterable`, producing up to `depth` items ahead on a
+    worker thread while the caller is still busy with the current one.
+
+    Errors raised by `iterable` are re-raised in the caller once the items
+    produced before them have been consumed.
+    """
+    items = queue.Queue(maxsize=depth)
+    stopped = threading.Event()
+
+    def put(item, error=None):
+        while not stopped.is_set():
+            try:
+                items.put((item, error), timeout=0.1)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def produce():
+        try:
+            for item in iterable:
+                if not put(item):
+                    return
+        except Exception as e:
+            put(_DONE, e)
+        else:
+            put(_DONE)
+
+    worker = threading.Thread(target=produce)
+    worker.daemon = True
+    worker.start()
+
+    try:
+        while True:
+            item, error = items.get()
+            if item is _DONE:
+                if error is not None:
+                    raise error
+                return
+            yield item
+    finally:
+        # Unblocks the worker if the caller stops iterating early
+        stopped.set()
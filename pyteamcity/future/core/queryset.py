@@ -1,42 +1,166 @@
+import collections
 import itertools
+import threading
+from concurrent.futures import ThreadPoolExecutor
 
 import requests
 
 from .. import exceptions
+from .columns import ColumnBuilder, columns_to_dataframe, import_numpy
+from .json_stream import iter_array
 from .locator import Locator
+from .prefetch import prefetched
+from .related import set_related
+
+STREAM_CHUNK_SIZE = 64 * 1024
 
 
 class QuerySet(object):
+    """
+    A lazily evaluated query against one REST endpoint.
+
+    Query sets are immutable: `filter`, `only`, `select_related` and
+    `prefetch_related` return a modified copy, each with its own locator
+    and result cache, so a base query set can be shared between threads
+    and refined independently.
+    """
+
     base_url = None
     _entity_factory = None
+    _data_key = None
+    # Whether the endpoint supports the `start` and `count` dimensions
+    _paged = False
+    # Name -> `Relation` for `select_related` and `prefetch_related`
+    _relations = {}
+    # Whether entities rarely change, so may be kept in the identity map
+    _cacheable = False
 
     def __init__(self, teamcity):
         self.teamcity = teamcity
         self.base_url = self.teamcity.base_url + self.__class__.uri
         self._locator = Locator()
+        self._fields = []
+        self._select_related = []
+        self._prefetch_related = []
         self._data_dict = {}
+        self._count = None
+        self._lock = threading.Lock()
+
+    def _clone(self):
+        query_set = self.__class__(self.teamcity)
+        query_set._locator = self._locator.copy()
+        query_set._fields = list(self._fields)
+        query_set._select_related = list(self._select_related)
+        query_set._prefetch_related = list(self._prefetch_related)
+        return query_set
 
     def _add_pred(self, name, value):
+        self._count = None
         return self._locator.add_pred(name, value)
 
-    def _get_url(self, details=False, href=None):
+    def only(self, *fields):
+        """
+        Ask the server to return only the given fields of each entity.
+
+        Fields use the REST API's names and may be nested projections,
+        e.g. `only('id', 'number', 'agent(name)')`. Attributes of the
+        returned entities whose fields were not requested are None.
+        """
+        query_set = self._clone()
+        query_set._fields.extend(fields)
+        return query_set
+
+    def _get_relation(self, name):
+        try:
+            return self._relations[name]
+        except KeyError:
+            raise exceptions.IllegalOperation(
+                '%s has no relation %r' % (self.__class__.__name__, name))
+
+    def select_related(self, *names):
+        """
+        Have the server embed the named related entities in each result, so
+        that accessing them does not issue another request.
+
+        Embedded entities are in the server's short form.
+        """
+        for name in names:
+            self._get_relation(name)
+        query_set = self._clone()
+        query_set._select_related.extend(names)
+        return query_set
+
+    def prefetch_related(self, *names):
+        """
+        Load the named related entities of each page of results with one
+        bulk request per relation, instead of one request per entity.
+        """
+        for name in names:
+            if self._get_relation(name).id_attr is None:
+                raise exceptions.IllegalOperation(
+                    'Relation %r can only be selected, not prefetched'
+                    % name)
+        query_set = self._clone()
+        query_set._prefetch_related.extend(names)
+        return query_set
+
+    def _get_fields(self, details=False):
+        if not (self._fields or self._select_related):
+            return None
+        entity_fields = list(self._fields) or [
+            '$long' if details else '$short']
+        for name in self._select_related:
+            entity_fields.append(
+                '%s($short)' % self._get_relation(name).data_key)
+        entity_fields = ','.join(entity_fields)
+        if details:
+            return entity_fields
+        return 'count,href,nextHref,prevHref,%s(%s)' % (
+            self._data_key, entity_fields)
+
+    def _get_url(self, details=False, href=None, locator=None, fields=None):
         if href is not None:
-            return self.teamcity.base_url + href
+            # hrefs returned by the server already include the auth prefix
+            return self.teamcity.base_base_url + href
 
         url = self.base_url
+        params = []
 
-        locator_str = str(self._locator)
+        if locator is None:
+            locator = self._locator
+        locator_str = str(locator)
         if locator_str:
             if details:
                 url += locator_str
             else:
-                url += '?locator=' + locator_str
+                params.append('locator=' + locator_str)
+
+        if fields is None:
+            fields = self._get_fields(details=details)
+        if fields:
+            params.append('fields=' + fields)
+
+        if params:
+            url += '?' + '&'.join(params)
 
         return url
 
-    def _fetch(self, details=False, href=None):
-        self.url = self._get_url(details=details, href=href)
-        res = self.teamcity.session.get(self.url)
+    def _fetch(self, details=False, href=None, locator=None, fields=None):
+        # Several threads may fetch windows of one query set at once, so
+        # the request uses its own `url`; `self.url` is for `PageJoiner`
+        url = self._get_url(
+            details=details, href=href, locator=locator, fields=fields)
+        self.url = url
+        single_flight = getattr(self.teamcity, 'single_flight', None)
+        if single_flight is not None:
+            return single_flight.do(url, lambda: self._get_json(url))
+        return self._get_json(url)
+
+    def _get_json(self, url):
+        return self._get(url).json()
+
+    def _get(self, url, **kwargs):
+        res = self.teamcity.session.get(url, **kwargs)
 
         try:
             res.raise_for_status()
@@ -51,65 +175,413 @@ class QuerySet(object):
                 reason=str(e),
                 text=e.response.text)
 
-        data = res.json()
-        return data
+        return res
 
     def _data(self, details=False, href=None):
         if not self._data_dict:
-            self._data_dict = self._fetch(details=details, href=href)
+            with self._lock:
+                if not self._data_dict:
+                    self._data_dict = self._fetch(details=details, href=href)
 
         return self._data_dict
 
-    def fetch_all(self):
-        if self._data_dict:
-            return
-        href = None
-        while href != -1:
-            # self._locator.page = (start, 50)
-            page = self._fetch(href=href)
-            for key, value in page.items():
-                if key in self._data_dict:
-                    if isinstance(value, list):
-                        self._data_dict[key].extend(value)
-                    elif isinstance(value, int):
-                        self._data_dict[key] += value
-                else:
-                    self._data_dict[key] = value
-            href = page.get('nextHref', -1)
-        for key, value in self._data_dict.items():
-            if isinstance(value, int):
-                setattr(self, key, value)
+    def _fetch_window(self, start, count):
+        locator = self._locator.copy()
+        locator.set_pred('start', start)
+        locator.set_pred('count', count)
+        return self._fetch(locator=locator)
+
+    def _iter_pages_parallel(self, parallel):
+        page = self._fetch()
+        yield page
+        page_size = len(page.get(self._data_key, []))
+        start = int(self._locator.get('start', 0)) + page_size
+
+        # The server only reports counts per page, so windows are requested
+        # in waves of `parallel` until one of them turns out to be the last.
+        with ThreadPoolExecutor(max_workers=parallel) as executor:
+            while page_size and 'nextHref' in page:
+                starts = [start + i * page_size for i in range(parallel)]
+                windows = executor.map(
+                    self._fetch_window, starts, [page_size] * parallel)
+                for page in windows:
+                    yield page
+                    if 'nextHref' not in page:
+                        break
+                start += parallel * page_size
+
+    def fetch_all(self, parallel=None):
+        """
+        Fetch every page of results into this query set.
+
+        With `parallel` > 1, pages are requested as concurrent
+        `start`/`count` windows on a pool of that many threads, and joined
+        back together in order.
+        """
+        if parallel is not None and parallel > 1 and not self._paged:
+            raise exceptions.IllegalOperation(
+                '%s does not support parallel fetching'
+                % self.__class__.__name__)
+        # Threads sharing this query set wait for the first one's pages,
+        # which are merged apart and published in one assignment
+        with self._lock:
+            if self._data_dict:
+                return
+            if parallel is not None and parallel > 1:
+                pages = self._iter_pages_parallel(parallel)
+            else:
+                pages = self._iter_pages()
+            data = {}
+            for page in pages:
+                for key, value in page.items():
+                    if key in data:
+                        if isinstance(value, list):
+                            data[key].extend(value)
+                        elif isinstance(value, int):
+                            data[key] += value
+                    elif isinstance(value, list):
+                        # Pages may be shared with other threads through
+                        # single-flight fetches, so they are never extended
+                        data[key] = list(value)
+                    else:
+                        data[key] = value
+            for key, value in data.items():
+                # `count` is available through the `count()` method
+                if isinstance(value, int) and key != 'count':
+                    setattr(self, key, value)
+            self._data_dict = data
         return self
 
+    def _iter_pages(self, locator=None):
+        href = None
+        while True:
+            page = self._fetch(href=href, locator=locator)
+            yield page
+            href = page.get('nextHref')
+            if href is None:
+                break
+
+    def _iter_streamed_pages(self):
+        """
+        Like `_iter_pages`, but each page's list of entities is a generator
+        parsed from the response body as it is read. The other keys of the
+        page, such as `nextHref`, are only all there once it is exhausted.
+        """
+        href = None
+        while True:
+            url = self._get_url(href=href)
+            self.url = url
+            res = self._get(url, stream=True)
+            try:
+                page = {}
+                page[self._data_key] = iter_array(
+                    res.iter_content(chunk_size=STREAM_CHUNK_SIZE),
+                    self._data_key, page)
+                yield page
+            finally:
+                res.close()
+            href = page.get('nextHref')
+            if href is None:
+                break
+
+    def iterator(self, prefetch=0, keep_raw=True, stream=False):
+        """
+        Iterate over every entity matched by this query set, following
+        `nextHref` one page at a time.
+
+        Unlike `fetch_all`, pages are not accumulated, so only the page
+        currently being consumed is held in memory.
+
+        With `prefetch` > 0, up to that many pages are requested ahead on a
+        background thread while the current page is being consumed.
+
+        With `keep_raw=False`, entities keep only the few keys of their
+        JSON needed by their properties (`_retained_keys`) instead of all
+        of it. Properties reading other keys, such as `parameters_dict`,
+        raise `KeyError` on such entities.
+
+        With `stream=True`, each response is parsed as it is read and its
+        entities are built one at a time, rather than decoding the whole
+        page first, so large page sizes (`filter(count=10000)`) do not
+        need memory for the whole page. Entities are still built a page at
+        a time with `select_related` or `prefetch_related`. Streamed
+        requests are not coalesced by `single_flight` or cached by
+        `http_cache`, and cannot be combined with `prefetch`.
+        """
+        if stream:
+            if prefetch:
+                raise exceptions.IllegalOperation(
+                    'iterator() does not support stream with prefetch')
+            pages = self._iter_streamed_pages()
+        else:
+            pages = self._iter_pages()
+        if prefetch:
+            pages = prefetched(pages, prefetch)
+        for page in pages:
+            for entity in self._entities(page):
+                if not keep_raw:
+                    self._drop_raw(entity)
+                yield entity
+
+    @staticmethod
+    def _drop_raw(entity):
+        d = entity._data_dict
+        entity._data_dict = dict(
+            (key, d[key]) for key in getattr(entity, '_retained_keys', ())
+            if key in d)
+
+    def to_columns(self, fields):
+        """
+        Return the given JSON `fields` of every entity as a dict of numpy
+        arrays, e.g. `to_columns(['id', 'status', 'finishDate'])`.
+
+        Only `fields` are requested, and each page is added to the columns
+        as it arrives without building entities. See `ColumnBuilder` for
+        the column types. Requires numpy.
+        """
+        builder = ColumnBuilder(fields, import_numpy())
+        query_set = self.only(
+            *[field for field in fields if field not in self._fields])
+        for page in query_set._iter_pages():
+            builder.add_page(page.get(self._data_key, []))
+        return builder.columns()
+
+    def to_dataframe(self, fields):
+        """Return `to_columns(fields)` as a pandas DataFrame"""
+        return columns_to_dataframe(self.to_columns(fields))
+
     @classmethod
     def _from_dict(cls, d, query_set):
         return cls._entity_factory.from_dict(d, query_set)
 
+    def _entities(self, page):
+        items = page.get(self._data_key, [])
+        if not (self._select_related or self._prefetch_related):
+            return (self._from_dict(d, self) for d in items)
+        entities = [self._from_dict(d, self) for d in items]
+        self._join_related(entities)
+        return iter(entities)
+
+    def _get_identity_map(self):
+        if self._cacheable:
+            return getattr(self.teamcity, 'identity_map', None)
+
+    def _chunk_query(self, ids):
+        """Return the locator and fields fetching the entities of `ids`"""
+        locator = Locator()
+        for id in ids:
+            locator.add_pred('item', '(id:%s)' % id)
+        if self._paged:
+            locator.add_pred('count', len(ids))
+        fields = self._get_fields() or 'count,%s($long)' % self._data_key
+        return locator, fields
+
+    def _fetch_chunk(self, ids):
+        locator, fields = self._chunk_query(ids)
+        page = self._fetch(locator=locator, fields=fields)
+        return list(self._entities(page))
+
+    def in_bulk(self, ids, chunk_size=100, max_workers=4):
+        """
+        Fetch the entities with the given ids, returning a dict of entity
+        id to entity.
+
+        Ids are looked up with multi-item locators of up to `chunk_size`
+        ids each, with up to `max_workers` of them in flight at once.
+        Filters of this query set are not applied; ids that match nothing
+        are left out of the result.
+        """
+        found, ids, identity_map = self._in_bulk_lookup(ids)
+        chunks = [ids[i:i + chunk_size] for i in range(0, len(ids), chunk_size)]
+        if len(chunks) > 1 and max_workers > 1:
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                results = list(executor.map(self._fetch_chunk, chunks))
+        else:
+            results = [self._fetch_chunk(chunk) for chunk in chunks]
+        self._in_bulk_add(found, results, identity_map)
+        return found
+
+    def _in_bulk_lookup(self, ids):
+        """
+        Return the entities of `ids` found in the identity map, the ids
+        left to fetch, and the identity map to add fetched entities to.
+        """
+        found = {}
+        ids = list(collections.OrderedDict.fromkeys(ids))
+        identity_map = self._get_identity_map()
+        entity_type = self._entity_factory.__name__
+        if identity_map is not None:
+            missing = []
+            for id in ids:
+                entity = identity_map.get(entity_type, id)
+                if entity is None:
+                    missing.append(id)
+                else:
+                    found[entity.id] = entity
+            ids = missing
+
+        if self._get_fields(details=True):
+            # Entities with only some fields must not be served to `get`
+            identity_map = None
+        return found, ids, identity_map
+
+    def _in_bulk_add(self, found, results, identity_map):
+        entity_type = self._entity_factory.__name__
+        for entities in results:
+            for entity in entities:
+                found[entity.id] = entity
+                if identity_map is not None:
+                    identity_map.add(entity_type, entity.id, entity)
+
+    def _join_related(self, entities):
+        self._join_selected(entities)
+        for name in self._prefetch_related:
+            relation = self._get_relation(name)
+            ids = self._related_ids(relation, entities)
+            if ids:
+                query_set = relation.query_set_class(self.teamcity)
+                self._set_related(
+                    name, relation, entities, query_set.in_bulk(ids))
+
+    def _join_selected(self, entities):
+        for name in self._select_related:
+            relation = self._get_relation(name)
+            query_set = relation.query_set_class(self.teamcity)
+            for entity in entities:
+                d = entity._data_dict.get(relation.data_key)
+                if d is not None:
+                    set_related(entity, name, query_set._from_dict(d, query_set))
+
+    @staticmethod
+    def _related_ids(relation, entities):
+        ids = set(getattr(entity, relation.id_attr) for entity in entities)
+        ids.discard(None)
+        return sorted(ids)
+
+    @staticmethod
+    def _set_related(name, relation, entities, related):
+        for entity in entities:
+            id = getattr(entity, relation.id_attr)
+            if id in related:
+                set_related(entity, name, related[id])
+
+    def _is_id_lookup(self, kwargs):
+        """Whether `get(**kwargs)` fetches the full entity by id alone"""
+        return (list(kwargs) == ['id'] and not str(self._locator) and
+                not self._get_fields(details=True))
+
+    def _identity_map_lookup(self, kwargs):
+        """
+        Return the identity map and entity type if `get(**kwargs)` is a
+        plain lookup by id that it can serve, else (None, None).
+        """
+        identity_map = self._get_identity_map()
+        if identity_map is None or not self._is_id_lookup(kwargs):
+            return None, None
+        return identity_map, self._entity_factory.__name__
+
     def get(self, just_url=False,
             raise_multiple_objects_returned=False,
             **kwargs):
-        self.filter(**kwargs)
-        if raise_multiple_objects_returned and len(self) > 1:
-            raise exceptions.MultipleObjectsReturned()
-        self._data_dict = None
+        identity_map, entity_type = self._identity_map_lookup(kwargs)
+        query_set = self.filter(**kwargs)
         if just_url:
-            return self._get_url(details=True)
-        else:
-            return self.__class__._from_dict(
-                self._data(details=True), self)
+            return query_set._get_url(details=True)
+        if identity_map is not None:
+            entity = identity_map.get(entity_type, kwargs['id'])
+            if entity is not None:
+                return entity
+        if raise_multiple_objects_returned and len(query_set) > 1:
+            raise exceptions.MultipleObjectsReturned()
+        query_set._data_dict = None
+        entity = query_set._from_dict(
+            query_set._data(details=True), query_set)
+        if query_set._select_related or query_set._prefetch_related:
+            query_set._join_related([entity])
+        if identity_map is not None:
+            identity_map.add(entity_type, kwargs['id'], entity)
+        return entity
+
+    def count(self):
+        """
+        Return the number of entities the server reports for this query.
+
+        Unless a page of results was already fetched, only the count is
+        requested (`fields=count`), and it is remembered for later calls.
+        """
+        if self._data_dict:
+            return self._data_dict.get('count', 0)
+        if self._count is None:
+            self._count = self._fetch(fields='count').get('count', 0)
+        return self._count
 
     def __len__(self):
-        data = self._data()
-        return data.get('count', 0)
+        return self.count()
+
+    def __iter__(self):
+        return self._entities(self._data())
 
     def __next__(self):  # pragma: no cover
         return next(self.__iter__())
 
     next = __next__
 
+    def _window(self, start, count):
+        """Fetch `count` entities from offset `start` of the results"""
+        offset = int(self._locator.get('start', 0))
+        limit = self._locator.get('count')
+        if limit is not None:
+            count = min(count, int(limit) - start)
+        if count <= 0:
+            return []
+        locator = self._locator.copy()
+        locator.set_pred('start', offset + start)
+        locator.set_pred('count', count)
+        entities = []
+        for page in self._iter_pages(locator=locator):
+            entities.extend(self._entities(page))
+            if len(entities) >= count:
+                break
+        return entities[:count]
+
     def __getitem__(self, index):
-        try:
-            return next(itertools.islice(self, index, index + 1))
-        except TypeError:  # pragma: no cover
-            return list(itertools.islice(
-                self, index.start, index.stop, index.step))
+        if not self._paged:
+            try:
+                return next(itertools.islice(self, index, index + 1))
+            except TypeError:  # pragma: no cover
+                return list(itertools.islice(
+                    self, index.start, index.stop, index.step))
+
+        # Serve indexes that fall into an already fetched page from it, and
+        # fetch only the requested window otherwise
+        items = self._data_dict.get(self._data_key) if self._data_dict else None
+        if items is not None:
+            if isinstance(index, slice):
+                if (index.stop is not None and
+                        0 <= (index.start or 0) and
+                        0 <= index.stop <= len(items)):
+                    return list(self._entities({self._data_key: items[index]}))
+            elif 0 <= index < len(items):
+                return next(self._entities({self._data_key: [items[index]]}))
+
+        if isinstance(index, slice):
+            start = index.start or 0
+            if start < 0 or (index.stop is not None and index.stop < 0):
+                raise ValueError('Negative indexing is not supported')
+            if index.stop is None:
+                locator = self._locator.copy()
+                locator.set_pred(
+                    'start', int(self._locator.get('start', 0)) + start)
+                entities = [entity
+                            for page in self._iter_pages(locator=locator)
+                            for entity in self._entities(page)]
+            else:
+                entities = self._window(start, index.stop - start)
+            return entities[::index.step]
+
+        if index < 0:
+            raise ValueError('Negative indexing is not supported')
+        entities = self._window(index, 1)
+        if not entities:
+            raise IndexError('QuerySet index out of range')
+        return entities[0]
@@ -0,0 +1,41 @@
+from .n_plus_one import request_origin
+
+
+class Relation(object):
+    """
+    A to-one relation from an entity to another entity type.
+
+    `data_key` is where the server embeds the related entity,
+    `id_attr` the entity attribute holding its id and `query_set_class`
+    the QuerySet used to fetch it. `query_set_class` may also be a function
+    returning the class, to avoid circular imports.
+    """
+
+    def __init__(self, data_key, id_attr, query_set_class):
+        self.data_key = data_key
+        self.id_attr = id_attr
+        self._query_set_class = query_set_class
+
+    @property
+    def query_set_class(self):
+        if isinstance(self._query_set_class, type):
+            return self._query_set_class
+        return self._query_set_class()
+
+
+def set_related(entity, name, related):
+    if getattr(entity, '_related', None) is None:
+        entity._related = {}
+    entity._related[name] = related
+
+
+def get_related(entity, name, query_set_class, id):
+    """
+    Return the entity related to `entity` as `name`, using what
+    `select_related`/`prefetch_related` already loaded if possible.
+    """
+    related = getattr(entity, '_related', None)
+    if related and name in related:
+        return related[name]
+    with request_origin('%s.%s' % (entity.__class__.__name__, name)):
+        return query_set_class(entity.teamcity).get(id=id)
@@ -0,0 +1,96 @@
+import email.utils
+import random
+import threading
+import time
+
+import requests
+
+
+class RetryPolicy(object):
+    """
+    Retries idempotent requests that failed to connect, timed out or got a
+    retryable status (`status_forcelist`).
+
+    The n-th retry waits a random time of up to
+    `backoff_factor * 2 ** n` seconds ("full jitter"), capped at
+    `max_backoff`. On a 429 or 503 carrying a `Retry-After` header that
+    delay is used instead, also capped at `max_backoff`. `retries` counts
+    retried attempts and `failures` requests given up on. Pass one to
+    `TeamCity(retry=...)` to use it.
+    """
+
+    def __init__(self, total=3, backoff_factor=0.5, max_backoff=60,
+                 status_forcelist=(429, 500, 502, 503, 504),
+                 methods=('GET', 'HEAD', 'OPTIONS', 'PUT', 'DELETE'),
+                 sleep=time.sleep, random=random.random):
+        self.total = total
+        self.backoff_factor = backoff_factor
+        self.max_backoff = max_backoff
+        self.status_forcelist = frozenset(status_forcelist)
+        self.methods = frozenset(methods)
+        self.sleep = sleep
+        self.random = random
+        self.retries = 0
+        self.failures = 0
+        self._lock = threading.Lock()
+
+    def _is_retryable(self, request):
+        if request.method not in self.methods:
+            return False
+        # A streamed body has been consumed by the first attempt
+        return request.body is None or isinstance(request.body, (bytes, str))
+
+    def backoff(self, retry):
+        delay = self.backoff_factor * (2 ** retry)
+        return self.random() * min(delay, self.max_backoff)
+
+    def retry_after(self, response):
+        if response.status_code not in (429, 503):
+            return None
+        value = response.headers.get('Retry-After')
+        if not value:
+            return None
+        try:
+            delay = float(value)
+        except ValueError:
+            date = email.utils.parsedate_tz(value)
+            if date is None:
+                return None
+            delay = email.utils.mktime_tz(date) - time.time()
+        return min(max(delay, 0), self.max_backoff)
+
+    def _count(self, retried):
+        with self._lock:
+            if retried:
+                self.retries += 1
+            else:
+                self.failures += 1
+
+    def send(self, send, request, **kwargs):
+        """Send `request` with the `send` function of a transport adapter"""
+        if not self._is_retryable(request):
+            return send(request, **kwargs)
+
+        retry = 0
+        while True:
+            try:
+                response = send(request, **kwargs)
+            except (requests.ConnectionError, requests.Timeout):
+                if retry >= self.total:
+                    self._count(retried=False)
+                    raise
+                delay = self.backoff(retry)
+            else:
+                if response.status_code not in self.status_forcelist:
+                    return response
+                if retry >= self.total:
+                    self._count(retried=False)
+                    return response
+                delay = self.retry_after(response)
+                if delay is None:
+                    delay = self.backoff(retry)
+                response.close()
+
+            self._count(retried=True)
+            retry += 1
+            self.sleep(delay)
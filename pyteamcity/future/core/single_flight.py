@@ -0,0 +1,51 @@
+import threading
+
+
+class _Call(object):
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight(object):
+    """
+    Coalesces concurrent calls for the same key into one.
+
+    While a call for a key is in flight, other threads calling `do` with
+    that key wait for it and share its result (or exception) instead of
+    making their own. Nothing is kept once the call completes. `shared`
+    counts calls answered that way. Pass one to
+    `TeamCity(single_flight=...)` to coalesce identical concurrent GETs;
+    threads then share the same decoded JSON, which must not be modified.
+    """
+
+    def __init__(self):
+        self.shared = 0
+        self._calls = {}
+        self._lock = threading.Lock()
+
+    def do(self, key, function):
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+            else:
+                self.shared += 1
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = function()
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result
@@ -1,9 +1,42 @@
+import datetime
+
 import dateutil.parser
+from dateutil.tz import tzoffset, tzutc
 
 from .. import exceptions
 
+_tzinfos = {}
+
+
+def _tzinfo(offset):
+    tzinfo = _tzinfos.get(offset)
+    if tzinfo is None:
+        # The same time zones as dateutil's, for equal results
+        tzinfo = tzutc() if offset == 0 else tzoffset(None, offset)
+        _tzinfos[offset] = tzinfo
+    return tzinfo
+
 
 def parse_date_string(date_string):
+    """
+    Parse a date in TeamCity's `yyyyMMdd'T'HHmmssZ` format, as in
+    `20161123T142834+0000`. Other formats are parsed by dateutil.
+    """
+    if (isinstance(date_string, str) and len(date_string) == 20
+            and date_string[8] == 'T' and date_string[15] in '+-'
+            and date_string[:8].isdigit() and date_string[9:15].isdigit()
+            and date_string[16:].isdigit()):
+        offset = int(date_string[16:18]) * 3600 + int(date_string[18:]) * 60
+        if date_string[15] == '-':
+            offset = -offset
+        try:
+            return datetime.datetime(
+                int(date_string[:4]), int(date_string[4:6]),
+                int(date_string[6:8]), int(date_string[9:11]),
+                int(date_string[11:13]), int(date_string[13:15]),
+                tzinfo=_tzinfo(offset))
+        except ValueError:
+            pass
     return dateutil.parser.parse(date_string)
 
 
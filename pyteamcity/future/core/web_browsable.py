@@ -2,5 +2,7 @@ import webbrowser
 
 
 class WebBrowsable(object):
+    __slots__ = ()
+
     def open_web_browser(self):
         webbrowser.open(self.web_url)
@@ -18,6 +18,14 @@ class ArtifactSizeExceeded(Error):
     pass
 
 
+class NPlusOneError(Error):
+    pass
+
+
+class NPlusOneWarning(UserWarning):
+    pass
+
+
 class ArtifactNotFound(Error):
     def __init__(self, path):
         self.path = path
@@ -0,0 +1,16 @@
+"""
+A stand-in TeamCity REST server with generated data, for testing and
+measuring `pyteamcity.future` without a live server::
+
+    with FakeTeamCityServer(DataGenerator(builds=500000)) as server:
+        tc = server.teamcity()
+        for build in tc.builds.all().iterator():
+            ...
+
+Run `python -m pyteamcity.future.fake_server --help` to serve it from the
+command line.
+"""
+
+from .app import FakeTeamCity  # noqa
+from .data import DataGenerator  # noqa
+from .server import FakeTeamCityServer  # noqa
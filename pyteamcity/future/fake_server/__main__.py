@@ -0,0 +1,44 @@
+import argparse
+
+from .data import DataGenerator
+from .server import FakeTeamCityServer
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog='python -m pyteamcity.future.fake_server',
+        description='Serve a fake TeamCity REST API with generated data')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8111)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--projects', type=int, default=10)
+    parser.add_argument('--build-types', type=int, default=100)
+    parser.add_argument('--builds', type=int, default=10000)
+    parser.add_argument('--queued-builds', type=int, default=50)
+    parser.add_argument('--agents', type=int, default=20)
+    parser.add_argument('--agent-pools', type=int, default=2)
+    parser.add_argument('--tests-per-build', type=int, default=100)
+    parser.add_argument('--artifacts-per-build', type=int, default=5)
+    args = parser.parse_args(argv)
+
+    generator = DataGenerator(
+        seed=args.seed,
+        projects=args.projects,
+        build_types=args.build_types,
+        builds=args.builds,
+        queued_builds=args.queued_builds,
+        agents=args.agents,
+        agent_pools=args.agent_pools,
+        tests_per_build=args.tests_per_build,
+        artifacts_per_build=args.artifacts_per_build)
+    server = FakeTeamCityServer(generator, host=args.host, port=args.port)
+    server.start()
+    print('Serving a fake TeamCity on %s' % server.url)
+    try:
+        server._thread.join()
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == '__main__':
+    main()
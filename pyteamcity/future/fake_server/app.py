@@ -0,0 +1,432 @@
+import itertools
+import json
+
+from six.moves.urllib.parse import parse_qsl
+
+from .data import DataGenerator
+
+DATA_KEYS = {
+    'builds': 'build',
+    'buildQueue': 'build',
+    'buildTypes': 'buildType',
+    'projects': 'project',
+    'agents': 'agent',
+    'agentPools': 'agentPool',
+    'changes': 'change',
+    'testOccurrences': 'testOccurrence',
+}
+SHORT_FIELDS = {
+    'builds': ('id', 'buildTypeId', 'number', 'status', 'state',
+               'branchName', 'href', 'webUrl'),
+    'buildQueue': ('id', 'buildTypeId', 'state', 'branchName', 'href',
+                   'webUrl'),
+    'buildTypes': ('id', 'name', 'projectName', 'projectId', 'href',
+                   'webUrl'),
+    'projects': ('id', 'name', 'parentProjectId', 'href', 'webUrl'),
+    'agents': ('id', 'name', 'typeId', 'href'),
+    'agentPools': ('id', 'name', 'href'),
+    'changes': ('id', 'version', 'username', 'date', 'href', 'webUrl'),
+    'testOccurrences': ('id', 'name', 'status', 'duration', 'href'),
+}
+PAGED = frozenset(['builds', 'buildQueue', 'changes', 'testOccurrences'])
+DEFAULT_PAGE_SIZE = 100
+ARTIFACT_RESOURCES = frozenset(['children', 'content', 'files', 'metadata'])
+
+
+class HTTPError(Exception):
+    def __init__(self, status, message):
+        super(HTTPError, self).__init__(message)
+        self.status = status
+        self.message = message
+
+
+def split_top_level(s):
+    """Split `s` on the commas that are not inside parentheses"""
+    parts = []
+    depth = 0
+    start = 0
+    for i, char in enumerate(s):
+        if char == '(':
+            depth += 1
+        elif char == ')':
+            depth -= 1
+        elif char == ',' and depth == 0:
+            parts.append(s[start:i])
+            start = i + 1
+    parts.append(s[start:])
+    return [part for part in parts if part]
+
+
+def _strip(value):
+    if value.startswith('(') and value.endswith(')'):
+        return value[1:-1]
+    return value
+
+
+def parse_locator(locator):
+    """Return the `(dimension, value)` pairs of `locator`"""
+    preds = []
+    for part in split_top_level(locator):
+        dim, sep, value = part.partition(':')
+        if not sep:
+            dim, value = 'id', dim
+        preds.append((dim, _strip(value)))
+    return preds
+
+
+def _id_of(value):
+    """Return the id in a dimension value such as `bt1` or `(id:bt1)`"""
+    value = _strip(value)
+    if ':' not in value:
+        return value
+    return dict(parse_locator(value)).get('id', value)
+
+
+class FakeTeamCity(object):
+    """
+    WSGI application serving the REST API endpoints used by
+    `pyteamcity.future` from a `DataGenerator`.
+
+    Supports `locator=` dimensions (`id`, `item`, `start`, `count`, and
+    the usual filters by build type, project, build, status, ...),
+    `fields=` projections, including `fields=count`, and paging of
+    builds, queued builds, changes and test occurrences through
+    `nextHref`. As on TeamCity, `count` is that of one page of results,
+    at most `count:` or the default page size. Unknown dimensions are
+    ignored.
+    """
+
+    def __init__(self, generator=None):
+        self.generator = generator or DataGenerator()
+
+    def __call__(self, environ, start_response):
+        try:
+            status, content_type, body = self._route(environ)
+        except HTTPError as e:
+            status, content_type, body = (
+                e.status, 'text/plain', e.message.encode('utf-8'))
+        start_response(status, [
+            ('Content-Type', content_type),
+            ('Content-Length', str(len(body))),
+        ])
+        return [body]
+
+    def _route(self, environ):
+        method = environ['REQUEST_METHOD']
+        segments = environ.get('PATH_INFO', '').split('/')[1:]
+        auth = 'guestAuth'
+        if segments and segments[0] in ('guestAuth', 'httpAuth'):
+            auth = segments.pop(0)
+        if segments[:2] != ['app', 'rest'] or len(segments) < 3:
+            raise HTTPError('404 Not Found', 'Not found')
+        kind = segments[2]
+        rest = [segment for segment in segments[3:] if segment]
+        query = dict(parse_qsl(environ.get('QUERY_STRING', '')))
+
+        if kind == 'server' and not rest:
+            return self._json(self._server_info())
+        if kind not in DATA_KEYS:
+            raise HTTPError('404 Not Found', 'Not found: ' + kind)
+        if not rest:
+            if method != 'GET':
+                raise HTTPError('405 Method Not Allowed', method)
+            return self._json(self._list(kind, auth, query))
+
+        entity = self._entity(kind, auth, rest[0])
+        if len(rest) == 1:
+            if method != 'GET':
+                raise HTTPError('405 Method Not Allowed', method)
+            return self._json(self._project(
+                kind, entity, query.get('fields', '$long')))
+        if kind == 'builds':
+            return self._build_resource(method, auth, entity, rest[1:])
+        raise HTTPError('404 Not Found', 'Not found: ' + '/'.join(rest))
+
+    @staticmethod
+    def _json(data):
+        body = json.dumps(data, separators=(',', ':')).encode('utf-8')
+        return '200 OK', 'application/json', body
+
+    def _server_info(self):
+        return {
+            'version': '2023.05 (build 129203)',
+            'versionMajor': 2023,
+            'versionMinor': 5,
+            'buildNumber': '129203',
+            'startTime': '20200101T000000+0000',
+            'currentTime': '20200101T000000+0000',
+            'buildDate': '20200101T000000+0000',
+            'internalId': 'fake-%s' % self.generator.seed,
+            'webUrl': 'http://teamcity',
+        }
+
+    # Locators
+
+    def _candidates(self, kind, preds):
+        """
+        Return the indexes of entities possibly matching `preds`, and the
+        predicates left to check on each entity.
+        """
+        generator = self.generator
+        total = generator.count(kind)
+        remaining = []
+        candidates = None
+        for dim, value in preds:
+            if dim in ('start', 'count', 'lookupLimit', 'defaultFilter'):
+                continue
+            if candidates is not None:
+                remaining.append((dim, value))
+            elif dim == 'id' and kind != 'testOccurrences':
+                index = generator.index(kind, _id_of(value))
+                candidates = [] if index is None else [index]
+            elif dim == 'id':
+                index = generator.index(kind, value)
+                candidates = [] if index is None else [index]
+            elif dim == 'buildType' and kind in ('builds', 'buildQueue'):
+                index = generator.index('buildTypes', _id_of(value))
+                step = generator.count('buildTypes')
+                candidates = [] if index is None else range(index, total, step)
+            elif dim == 'build' and kind in ('changes', 'testOccurrences'):
+                index = generator.index('builds', _id_of(value))
+                if index is None:
+                    candidates = []
+                elif kind == 'changes':
+                    candidates = [index]
+                else:
+                    size = generator.tests_per_build
+                    candidates = range(index * size, (index + 1) * size)
+            else:
+                remaining.append((dim, value))
+        if candidates is None:
+            if kind == 'testOccurrences':
+                raise HTTPError(
+                    '400 Bad Request',
+                    'Test occurrences can only be listed for a build')
+            candidates = range(total)
+            if kind == 'builds':
+                # Like the server, newest builds first
+                candidates = range(total - 1, -1, -1)
+        return candidates, remaining
+
+    def _matches(self, kind, d, dim, value):
+        generator = self.generator
+        if dim == 'id':
+            if kind == 'testOccurrences':
+                return d['id'].startswith('id:%s,' % value)
+            return str(d['id']) == _id_of(value)
+        if dim == 'item':
+            return all(
+                self._matches(kind, d, item_dim, item_value)
+                for item_dim, item_value in parse_locator(value))
+        if dim == 'buildType':
+            return d.get('buildTypeId') == _id_of(value)
+        if dim in ('project', 'affectedProject'):
+            project_id = _id_of(value)
+            if kind == 'buildTypes':
+                return d['projectId'] == project_id
+            if 'buildTypeId' in d:
+                index = generator.index('buildTypes', d['buildTypeId'])
+                return generator.project_id(index) == project_id
+            return True
+        if dim == 'build':
+            if kind == 'testOccurrences':
+                return str(d['build']['id']) == _id_of(value)
+            return kind != 'changes' or str(d['id']) == _id_of(value)
+        if dim == 'running':
+            return (d.get('state') == 'running') == (value.lower() == 'true')
+        if dim == 'branch':
+            return d.get('branchName') == dict(
+                parse_locator(value)).get('name', value)
+        if dim == 'pool':
+            return str(d.get('pool', {}).get('id')) == _id_of(value)
+        if dim in d and not isinstance(d[dim], (dict, list)):
+            return str(d[dim]).lower() == value.lower()
+        return True
+
+    def _matching(self, kind, auth, preds):
+        items = [value for dim, value in preds if dim == 'item']
+        if items:
+            others = [(dim, value) for dim, value in preds if dim != 'item']
+            indexes = set()
+            for item in items:
+                candidates, remaining = self._candidates(
+                    kind, parse_locator(item) + others)
+                for index in candidates:
+                    d = self.generator.entity(kind, index, auth)
+                    if all(self._matches(kind, d, dim, value)
+                           for dim, value in remaining):
+                        indexes.add(index)
+            return sorted(indexes), []
+        return self._candidates(kind, preds)
+
+    def _iter_matching(self, kind, auth, candidates, remaining):
+        for index in candidates:
+            d = self.generator.entity(kind, index, auth)
+            if all(self._matches(kind, d, dim, value)
+                   for dim, value in remaining):
+                yield d
+
+    def _entity(self, kind, auth, locator):
+        candidates, remaining = self._matching(
+            kind, auth, parse_locator(locator))
+        for d in self._iter_matching(kind, auth, candidates, remaining):
+            return d
+        raise HTTPError(
+            '404 Not Found',
+            'Nothing is found by locator %r' % locator)
+
+    # Lists
+
+    def _list(self, kind, auth, query):
+        preds = parse_locator(query.get('locator', ''))
+        dims = dict(preds)
+        start = int(dims.get('start', 0))
+        count = dims.get('count')
+        if count is not None:
+            count = int(count)
+        elif kind in PAGED:
+            count = DEFAULT_PAGE_SIZE
+        fields = query.get('fields')
+        data_key = DATA_KEYS[kind]
+        top_fields = ['count', 'href', 'nextHref', 'prevHref', data_key]
+        entity_fields = None
+        if fields is not None:
+            top_fields = []
+            for field in split_top_level(fields):
+                name, _, sub = field.partition('(')
+                top_fields.append(name)
+                if name == data_key and sub:
+                    entity_fields = sub[:-1]
+
+        candidates, remaining = self._matching(kind, auth, preds)
+
+        if top_fields == ['count']:
+            if remaining:
+                total = sum(1 for _ in self._iter_matching(
+                    kind, auth, candidates, remaining))
+            else:
+                total = len(candidates)
+            # Like TeamCity, count what one page would hold, not the total
+            total = max(total - start, 0)
+            if count is not None:
+                total = min(total, count)
+            return {'count': total}
+
+        if not remaining:
+            # Only the requested window of entities is generated
+            end = None if count is None else start + count + 1
+            indexes = itertools.islice(candidates, start, end)
+            matching = (
+                self.generator.entity(kind, index, auth) for index in indexes)
+        else:
+            matching = itertools.islice(
+                self._iter_matching(kind, auth, candidates, remaining),
+                start, None if count is None else start + count + 1)
+        page = list(matching)
+        has_next = count is not None and len(page) > count
+        if has_next:
+            page = page[:count]
+
+        data = {'count': len(page)}
+        data['href'] = self._href(kind, auth, preds, fields)
+        if has_next:
+            data['nextHref'] = self._href(
+                kind, auth, preds, fields, start=start + count, count=count)
+        if start and count is not None:
+            data['prevHref'] = self._href(
+                kind, auth, preds, fields,
+                start=max(start - count, 0), count=count)
+        data[data_key] = [
+            self._project(kind, d, entity_fields or '$short') for d in page]
+        return dict(
+            (key, value) for key, value in data.items()
+            if key in top_fields)
+
+    @staticmethod
+    def _href(kind, auth, preds, fields, start=None, count=None):
+        preds = [
+            (dim, value) for dim, value in preds
+            if start is None or dim not in ('start', 'count')]
+        if start is not None:
+            preds += [('count', count), ('start', start)]
+        locator = ','.join(
+            '%s:%s' % (dim, '(%s)' % value if ':' in str(value) else value)
+            for dim, value in preds)
+        href = '/%s/app/rest/%s/' % (auth, kind)
+        params = []
+        if locator:
+            params.append('locator=' + locator)
+        if fields:
+            params.append('fields=' + fields)
+        if params:
+            href += '?' + '&'.join(params)
+        return href
+
+    @staticmethod
+    def _project(kind, d, fields):
+        fields = split_top_level(fields)
+        if '$long' in fields:
+            projected = dict(d)
+        elif '$short' in fields:
+            projected = dict(
+                (key, d[key]) for key in SHORT_FIELDS[kind] if key in d)
+        else:
+            projected = {}
+        for field in fields:
+            name = field.partition('(')[0]
+            if name in d:
+                projected[name] = d[name]
+        return projected
+
+    # Build resources
+
+    def _build_resource(self, method, auth, build, rest):
+        if rest == ['pin']:
+            if method == 'GET':
+                return '200 OK', 'text/plain', b'false'
+            if method in ('PUT', 'DELETE'):
+                return '204 No Content', 'text/plain', b''
+        if method != 'GET':
+            raise HTTPError('405 Method Not Allowed', method)
+        if rest == ['resulting-properties']:
+            return self._json(build['properties'])
+        if rest[0] != 'artifacts' or len(rest) < 2 \
+                or rest[1] not in ARTIFACT_RESOURCES:
+            raise HTTPError('404 Not Found', 'Not found: ' + '/'.join(rest))
+
+        resource = rest[1]
+        path = '/'.join(rest[2:])
+        if resource in ('content', 'files'):
+            content = self.generator.artifact_content(build['id'], path)
+            if content is None:
+                raise HTTPError('404 Not Found', 'No artifact ' + path)
+            return '200 OK', 'application/octet-stream', content
+
+        artifact = self.generator.artifacts(build['id'], path)
+        if artifact is None:
+            raise HTTPError('404 Not Found', 'No artifact ' + path)
+        prefix = '/%s/app/rest/builds/id:%s/artifacts' % (auth, build['id'])
+        if resource == 'metadata':
+            return self._json(self._artifact(prefix, path, artifact))
+        if 'children' not in artifact:
+            raise HTTPError('400 Bad Request', path + ' is not a directory')
+        files = [
+            self._artifact(
+                prefix, '/'.join(filter(None, [path, child['name']])),
+                dict(child, modificationTime=artifact['modificationTime']))
+            for child in artifact['children']]
+        return self._json({'count': len(files), 'file': files})
+
+    @staticmethod
+    def _artifact(prefix, path, artifact):
+        d = {
+            'name': artifact['name'],
+            'modificationTime': artifact['modificationTime'],
+            'href': prefix + '/metadata/' + path,
+        }
+        if 'children' in artifact:
+            d['children'] = {'href': prefix + '/children/' + path}
+        else:
+            d['size'] = artifact['size']
+            d['content'] = {'href': prefix + '/content/' + path}
+        return d
@@ -0,0 +1,278 @@
+import datetime
+import hashlib
+import random
+
+EPOCH = datetime.datetime(2020, 1, 1, tzinfo=datetime.timezone.utc)
+STATUSES = ('SUCCESS',) * 9 + ('FAILURE',)
+BRANCHES = ('master', 'develop', 'release', 'feature/1', 'feature/2')
+
+
+def _date(seconds):
+    date = EPOCH + datetime.timedelta(seconds=seconds)
+    return date.strftime('%Y%m%dT%H%M%S+0000')
+
+
+class DataGenerator(object):
+    """
+    Generates a TeamCity server's entities on demand from `seed`.
+
+    Nothing is stored: the entity of a kind at an index is rebuilt from
+    the seed each time it is asked for, so a server of 500k builds costs
+    no memory. Entities are the `$long` JSON the REST API would return,
+    with `href`s relative to `auth` (`'guestAuth'` or `'httpAuth'`).
+
+    Builds `1..builds` are spread round-robin over build types, build
+    types over projects and agents over agent pools. Build `n` has
+    `tests_per_build` test occurrences, `artifacts_per_build` artifacts
+    and is the only build of change `n`.
+    """
+
+    kinds = ('projects', 'buildTypes', 'builds', 'buildQueue', 'agents',
+             'agentPools', 'changes', 'testOccurrences')
+
+    def __init__(self, seed=0, projects=10, build_types=100, builds=10000,
+                 queued_builds=50, agents=20, agent_pools=2,
+                 tests_per_build=100, artifacts_per_build=5):
+        self.seed = seed
+        self.counts = {
+            'projects': projects,
+            'buildTypes': build_types,
+            'builds': builds,
+            'buildQueue': queued_builds,
+            'agents': agents,
+            'agentPools': agent_pools,
+            'changes': builds,
+            'testOccurrences': builds * tests_per_build,
+        }
+        self.tests_per_build = tests_per_build
+        self.artifacts_per_build = artifacts_per_build
+
+    def _random(self, kind, index):
+        return random.Random('%s:%s:%d' % (self.seed, kind, index))
+
+    def count(self, kind):
+        return self.counts[kind]
+
+    def entity(self, kind, index, auth='guestAuth'):
+        """Return the entity of `kind` at `index` (from 0)"""
+        if not 0 <= index < self.counts[kind]:
+            return None
+        return getattr(self, '_' + kind)(index, '/' + auth)
+
+    def index(self, kind, id):
+        """Return the index of the entity of `kind` with `id`, or None"""
+        try:
+            if kind in ('projects', 'buildTypes'):
+                prefix = 'Project' if kind == 'projects' else 'bt'
+                if not id.startswith(prefix):
+                    return None
+                index = int(id[len(prefix):])
+            elif kind == 'testOccurrences':
+                index = int(id) - 1
+            else:
+                index = int(id) - (0 if kind == 'agentPools' else 1)
+                if kind == 'buildQueue':
+                    index -= self.counts['builds']
+        except ValueError:
+            return None
+        if 0 <= index < self.counts[kind]:
+            return index
+        return None
+
+    def build_type_id(self, build_index):
+        return 'bt%d' % (build_index % self.counts['buildTypes'])
+
+    def project_id(self, build_type_index):
+        return 'Project%d' % (build_type_index % self.counts['projects'])
+
+    def _projects(self, index, prefix):
+        id = 'Project%d' % index
+        d = {
+            'id': id,
+            'name': 'Project %d' % index,
+            'description': 'Generated project %d' % index,
+            'href': prefix + '/app/rest/projects/id:' + id,
+            'webUrl': 'http://teamcity/project.html?projectId=' + id,
+        }
+        if index:
+            d['parentProjectId'] = 'Project%d' % ((index - 1) // 10)
+        d['parameters'] = {'count': 1, 'property': [
+            {'name': 'env.PROJECT', 'value': id}]}
+        d['projects'] = {'count': 0, 'project': []}
+        return d
+
+    def _buildTypes(self, index, prefix):
+        id = 'bt%d' % index
+        project_id = self.project_id(index)
+        project_index = int(project_id[len('Project'):])
+        d = {
+            'id': id,
+            'name': 'Build type %d' % index,
+            'description': 'Generated build type %d' % index,
+            'projectName': 'Project %d' % project_index,
+            'projectId': project_id,
+            'href': prefix + '/app/rest/buildTypes/id:' + id,
+            'webUrl': 'http://teamcity/viewType.html?buildTypeId=' + id,
+            'paused': False,
+            'templateFlag': False,
+        }
+        d['project'] = {
+            'id': project_id,
+            'name': d['projectName'],
+            'href': prefix + '/app/rest/projects/id:' + project_id,
+        }
+        d['parameters'] = {'count': 1, 'property': [
+            {'name': 'env.BUILD_TYPE', 'value': id}]}
+        return d
+
+    def _builds(self, index, prefix):
+        rnd = self._random('builds', index)
+        id = index + 1
+        build_type_id = self.build_type_id(index)
+        build_type_index = index % self.counts['buildTypes']
+        queued = index * 60
+        started = queued + rnd.randint(0, 300)
+        running = index >= self.counts['builds'] - 2
+        agent_index = rnd.randrange(max(self.counts['agents'], 1))
+        d = {
+            'id': id,
+            'buildTypeId': build_type_id,
+            'number': str(index // self.counts['buildTypes'] + 1),
+            'status': rnd.choice(STATUSES),
+            'state': 'running' if running else 'finished',
+            'branchName': rnd.choice(BRANCHES),
+            'href': prefix + '/app/rest/builds/id:%d' % id,
+            'webUrl': 'http://teamcity/viewLog.html?buildId=%d' % id,
+            'statusText': 'Tests passed: %d' % self.tests_per_build,
+            'queuedDate': _date(queued),
+            'startDate': _date(started),
+        }
+        if not running:
+            d['finishDate'] = _date(started + rnd.randint(30, 3600))
+        d['buildType'] = {
+            'id': build_type_id,
+            'name': 'Build type %d' % build_type_index,
+            'projectId': self.project_id(build_type_index),
+            'href': prefix + '/app/rest/buildTypes/id:' + build_type_id,
+        }
+        if self.counts['agents']:
+            d['agent'] = self._short(self._agents(agent_index, prefix))
+        d['triggered'] = {'type': 'vcs', 'date': _date(queued)}
+        d['properties'] = {'count': 1, 'property': [
+            {'name': 'env.BUILD_ID', 'value': str(id)}]}
+        return d
+
+    def _buildQueue(self, index, prefix):
+        id = self.counts['builds'] + index + 1
+        build_type_id = self.build_type_id(index)
+        return {
+            'id': id,
+            'buildTypeId': build_type_id,
+            'state': 'queued',
+            'branchName': BRANCHES[index % len(BRANCHES)],
+            'href': prefix + '/app/rest/buildQueue/id:%d' % id,
+            'webUrl': 'http://teamcity/viewQueued.html?itemId=%d' % id,
+            'queuedDate': _date(self.counts['builds'] * 60 + index),
+            'properties': {'count': 0, 'property': []},
+        }
+
+    def _agents(self, index, prefix):
+        id = index + 1
+        pool_id = index % max(self.counts['agentPools'], 1)
+        return {
+            'id': id,
+            'name': 'agent-%d' % id,
+            'typeId': id,
+            'ip': '10.0.%d.%d' % (id // 256, id % 256),
+            'enabled': True,
+            'connected': index % 10 != 9,
+            'authorized': True,
+            'href': prefix + '/app/rest/agents/id:%d' % id,
+            'pool': {
+                'id': pool_id,
+                'name': 'Pool %d' % pool_id,
+                'href': prefix + '/app/rest/agentPools/id:%d' % pool_id,
+            },
+        }
+
+    def _agentPools(self, index, prefix):
+        agents = [
+            self._short(self._agents(agent_index, prefix))
+            for agent_index in range(index, self.counts['agents'],
+                                     self.counts['agentPools'])]
+        return {
+            'id': index,
+            'name': 'Pool %d' % index,
+            'href': prefix + '/app/rest/agentPools/id:%d' % index,
+            'agents': {'count': len(agents), 'agent': agents},
+            'projects': {'count': 0, 'project': []},
+        }
+
+    def _changes(self, index, prefix):
+        rnd = self._random('changes', index)
+        id = index + 1
+        return {
+            'id': id,
+            'version': hashlib.sha1(
+                ('%s:%d' % (self.seed, id)).encode('ascii')).hexdigest(),
+            'username': 'user%d' % rnd.randrange(50),
+            'date': _date(index * 60 - rnd.randint(0, 600)),
+            'href': prefix + '/app/rest/changes/id:%d' % id,
+            'webUrl': 'http://teamcity/viewModification.html?modId=%d' % id,
+        }
+
+    def _testOccurrences(self, index, prefix):
+        rnd = self._random('testOccurrences', index)
+        id = index + 1
+        build_id = index // self.tests_per_build + 1
+        status = 'FAILURE' if rnd.random() < 0.01 else 'SUCCESS'
+        locator = 'id:%d,build:(id:%d)' % (id, build_id)
+        return {
+            'id': locator,
+            'name': 'tests.test_module%d.test_%d' % (
+                index % self.tests_per_build // 10, index),
+            'status': status,
+            'muted': False,
+            'duration': rnd.randint(1, 5000),
+            'href': prefix + '/app/rest/testOccurrences/' + locator,
+            'details': 'AssertionError' if status == 'FAILURE' else '',
+            'build': {'id': build_id},
+            'test': {'id': index % self.tests_per_build},
+        }
+
+    def artifacts(self, build_id, path):
+        """
+        Return the artifact at `path` of a build as metadata JSON without
+        hrefs, with a `children` list for directories, or None.
+        """
+        if not 1 <= build_id <= self.counts['builds']:
+            return None
+        files = [
+            {'name': 'file%d.txt' % i, 'size': 100 + i * 10}
+            for i in range(self.artifacts_per_build)]
+        tree = {'name': '', 'children': [
+            {'name': 'logs', 'children': [
+                {'name': 'build.log', 'size': 2048}]},
+        ] + files}
+        modification_time = _date((build_id - 1) * 60 + 3600)
+        node = tree
+        for name in [part for part in path.split('/') if part]:
+            children = dict(
+                (child['name'], child) for child in node.get('children', ()))
+            if name not in children:
+                return None
+            node = children[name]
+        return dict(node, modificationTime=modification_time)
+
+    def artifact_content(self, build_id, path):
+        artifact = self.artifacts(build_id, path)
+        if artifact is None or 'children' in artifact:
+            return None
+        line = ('build %d %s\n' % (build_id, path)).encode('utf-8')
+        return (line * (artifact['size'] // len(line) + 1))[:artifact['size']]
+
+    @staticmethod
+    def _short(d):
+        return dict(
+            (key, value) for key, value in d.items()
+            if not isinstance(value, (dict, list)))
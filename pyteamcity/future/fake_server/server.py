@@ -0,0 +1,64 @@
+import threading
+from wsgiref.simple_server import make_server, WSGIRequestHandler, WSGIServer
+
+from six.moves.socketserver import ThreadingMixIn
+
+from .app import FakeTeamCity
+
+
+class _ThreadingWSGIServer(ThreadingMixIn, WSGIServer):
+    daemon_threads = True
+
+
+class _QuietRequestHandler(WSGIRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+
+class FakeTeamCityServer(object):
+    """
+    Serves a `FakeTeamCity` application over HTTP on a background thread.
+
+    `port=0` picks a free port, available as `port` once started. Each
+    request is handled on its own thread, and connections are not kept
+    alive. Use as a context manager, or call `start()` and `stop()`.
+    """
+
+    def __init__(self, generator=None, host='127.0.0.1', port=0):
+        self.app = FakeTeamCity(generator)
+        self.host = host
+        self.port = port
+        self._server = None
+        self._thread = None
+
+    @property
+    def url(self):
+        return 'http://%s:%d' % (self.host, self.port)
+
+    def start(self):
+        self._server = make_server(
+            self.host, self.port, self.app,
+            server_class=_ThreadingWSGIServer,
+            handler_class=_QuietRequestHandler)
+        self.port = self._server.server_port
+        self._thread = threading.Thread(target=self._server.serve_forever)
+        self._thread.daemon = True
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+        self._thread.join()
+
+    def teamcity(self, **kwargs):
+        """Return a `TeamCity` client for this server"""
+        from ..teamcity import TeamCity
+
+        return TeamCity(server=self.host, port=self.port, **kwargs)
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
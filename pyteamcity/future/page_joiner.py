@@ -1,6 +1,7 @@
 class PageJoiner(object):
-    def __init__(self, query_set):
+    def __init__(self, query_set, prefetch=0):
         self.query_set = query_set
+        self.prefetch = prefetch
         self.num_items = 0
 
     @property
@@ -11,13 +12,6 @@ class PageJoiner(object):
         return self.num_items
 
     def __iter__(self):
-        data = self.query_set._data()
-        while data.get('count') > 0:
-            for x in self.query_set:
-                yield x
-                self.num_items += 1
-            if 'nextHref' in data:
-                self.query_set._data_dict = None
-                data = self.query_set._data(href=data['nextHref'])
-            else:
-                break
+        for x in self.query_set.iterator(prefetch=self.prefetch):
+            yield x
+            self.num_items += 1
@@ -1,11 +1,18 @@
 from .build_type import BuildType
+from .core.identity_map import discard_entity
 from .core.parameter import Parameter
 from .core.queryset import QuerySet
+from .core.related import get_related, Relation
 from .core.web_browsable import WebBrowsable
 from .core.utils import raise_on_status
 
 
 class Project(WebBrowsable):
+    __slots__ = (
+        'id', 'name', 'description', 'href', 'web_url', 'parent_project_id',
+        'teamcity', 'project_query_set', '_data_dict', '_related')
+    _retained_keys = ('projects',)
+
     def __init__(self, id, name, description,
                  href, web_url, parent_project_id,
                  teamcity, project_query_set,
@@ -58,8 +65,8 @@ class Project(WebBrowsable):
 
     @property
     def parent_project(self):
-        teamcity = self.project_query_set.teamcity
-        return ProjectQuerySet(teamcity).get(id=self.parent_project_id)
+        return get_related(
+            self, 'parent_project', ProjectQuerySet, self.parent_project_id)
 
     @property
     def parameters_dict(self):
@@ -79,6 +86,7 @@ class Project(WebBrowsable):
         url = self.teamcity.base_base_url + self.href
         res = self.teamcity.session.delete(url)
         raise_on_status(res)
+        discard_entity(self)
 
     def create_build_type(self, name):
         """
@@ -91,6 +99,7 @@ class Project(WebBrowsable):
             headers={'Content-Type': 'text/plain'},
             data=name)
         raise_on_status(res)
+        discard_entity(self)
         build_type = BuildType.from_dict(res.json(), teamcity=self.teamcity)
         return build_type
 
@@ -120,6 +129,7 @@ class Project(WebBrowsable):
                      'Accept': 'text/plain'},
             data=str(parameter_value))
         raise_on_status(res)
+        discard_entity(self)
 
     def set_description(self, description):
         url = self.teamcity.base_base_url + self.href + '/description'
@@ -129,21 +139,27 @@ class Project(WebBrowsable):
                      'Accept': 'text/plain'},
             data=description)
         raise_on_status(res)
+        discard_entity(self)
 
 
 class ProjectQuerySet(QuerySet):
     uri = '/app/rest/projects/'
     _entity_factory = Project
+    _data_key = 'project'
+    _cacheable = True
+    _relations = {
+        'parent_project': Relation(
+            'parentProject', 'parent_project_id',
+            lambda: ProjectQuerySet),
+    }
 
     def filter(self, id=None, name=None):
+        query_set = self._clone()
         if id is not None:
-            self._add_pred('id', id)
+            query_set._add_pred('id', id)
         if name is not None:
-            self._add_pred('name', name)
-        return self
-
-    def __iter__(self):
-        return (Project.from_dict(d, self) for d in self._data()['project'])
+            query_set._add_pred('name', name)
+        return query_set
 
     def create(self, name, id=None, parent_project_locator='id:_Root', source_project_locator=None):
         """ source_project_locator is an optional locator string of the project to create a copy of. """
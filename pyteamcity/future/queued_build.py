@@ -1,5 +1,6 @@
 from .core.parameter import Parameter
 from .core.queryset import QuerySet
+from .core.related import get_related, Relation
 from .core.utils import parse_date_string, raise_on_status
 from .core.web_browsable import WebBrowsable
 
@@ -9,6 +10,11 @@ from .user import User
 
 
 class QueuedBuild(WebBrowsable):
+    __slots__ = (
+        'id', 'build_type_id', 'queued_date_string', 'branch_name', 'href',
+        'web_url', 'teamcity', 'build_query_set', '_data_dict', '_related')
+    _retained_keys = ('triggered',)
+
     def __init__(self, id,
                  build_type_id,
                  queued_date_string,
@@ -37,7 +43,8 @@ class QueuedBuild(WebBrowsable):
 
     @property
     def build_type(self):
-        return BuildTypeQuerySet(self.teamcity).get(id=self.build_type_id)
+        return get_related(
+            self, 'build_type', BuildTypeQuerySet, self.build_type_id)
 
     def __repr__(self):
         return '<%s.%s: id=%r build_type_id=%r>' % (
@@ -114,33 +121,35 @@ class QueuedBuild(WebBrowsable):
 class QueuedBuildQuerySet(QuerySet):
     uri = '/app/rest/buildQueue/'
     _entity_factory = QueuedBuild
+    _data_key = 'build'
+    _paged = True
+    _relations = {
+        'build_type': Relation('buildType', 'build_type_id', BuildTypeQuerySet),
+    }
 
     def filter(self,
                id=None,
                project=None,
                build_type=None, branch=None, user=None,
                start=None, count=None, lookup_limit=None):
+        query_set = self._clone()
         if id is not None:
-            self._add_pred('id', id)
+            query_set._add_pred('id', id)
         if project is not None:
-            self._add_pred('project', '(%s)' % project)
+            query_set._add_pred('project', '(%s)' % project)
         if build_type is not None:
-            self._add_pred('buildType', build_type)
+            query_set._add_pred('buildType', build_type)
         if branch is not None:
-            self._add_pred('branch', branch)
+            query_set._add_pred('branch', branch)
         if user is not None:
-            self._add_pred('user', '(%s)' % user)
+            query_set._add_pred('user', '(%s)' % user)
         if start is not None:
-            self._add_pred('start', start)
+            query_set._add_pred('start', start)
         if count is not None:
-            self._add_pred('count', count)
+            query_set._add_pred('count', count)
         if lookup_limit is not None:
-            self._add_pred('lookupLimit', lookup_limit)
-        return self
-
-    def __iter__(self):
-        return (self._entity_factory.from_dict(d, self)
-                for d in self._data().get('build', []))
+            query_set._add_pred('lookupLimit', lookup_limit)
+        return query_set
 
     def trigger_build(self,
                       build_type_id, branch=None, comment=None,
@@ -1,8 +1,13 @@
+import contextlib
 import os
 
 import requests
 
+from . import exceptions
+from .core.adapter import MountedAdapters, TeamCityAdapter
+from .core.har import HARRecorder, HARReplayAdapter
 from .core.manager import Manager
+from .core.n_plus_one import NPlusOneDetector
 from .core.utils import parse_date_string, raise_on_status
 
 from .agent import AgentQuerySet
@@ -36,26 +41,95 @@ class Plugin(object):
 
 
 class TeamCity(object):
+    """
+    Client for the TeamCity REST API.
+
+    A single instance may be shared by many threads: query sets never
+    modify each other, and requests go through one `requests.Session`
+    whose connection pool is thread-safe.
+
+    `pool_connections` and `pool_maxsize` size that connection pool;
+    raise `pool_maxsize` to match the number of threads sharing the
+    client. `max_concurrency` caps the requests in flight at once, and
+    `retry` is a `RetryPolicy` retrying requests that failed.
+    `single_flight` coalesces identical query set requests made
+    concurrently, and `metrics` is a `MetricsCollector` recording every
+    request. `on_request` and `on_response` register further hooks.
+
+    Adapters mounted on the `http://` and `https://` prefixes of a given
+    `session` keep sending its requests underneath these features; size
+    their pools on them rather than with `pool_connections` and
+    `pool_maxsize`, which then raise `exceptions.IllegalOperation`.
+
+    `record_to` is the path of a HAR file to record requests and
+    responses to, and `replay_from` one to serve responses from instead
+    of the server.
+    """
+
     username = None
     password = None
     server = None
     port = None
     protocol = None
     session = None
+    identity_map = None
+    http_cache = None
+    build_store = None
+    adapter = None
+    single_flight = None
+    metrics = None
+    recorder = None
+    _own_session = True
     projects = None
 
     def __init__(self,
                  username=None, password=None,
                  protocol='http', server='127.0.0.1', port=None,
-                 session=None):
+                 session=None, identity_map=None, http_cache=None,
+                 build_store=None,
+                 pool_connections=None, pool_maxsize=None,
+                 max_concurrency=None, retry=None, single_flight=None,
+                 metrics=None, record_to=None, replay_from=None):
         self.username = username
         self.password = password
         self.protocol = protocol
         self.server = server
         self.port = port or (443 if protocol == 'https' else 80)
+        if session is not None and (
+                pool_connections is not None or pool_maxsize is not None):
+            raise exceptions.IllegalOperation(
+                'pool_connections and pool_maxsize cannot be used with '
+                'session; configure the adapters mounted on the session')
+        self._own_session = session is None
         self.session = session or requests.Session()
         self.session.auth = (username, password)
         self.session.headers['Accept'] = 'application/json'
+        self.identity_map = identity_map
+        self.http_cache = http_cache
+        self.build_store = build_store
+        self.single_flight = single_flight
+
+        adapter_kwargs = {}
+        if pool_connections is not None:
+            adapter_kwargs['pool_connections'] = pool_connections
+        if pool_maxsize is not None:
+            adapter_kwargs['pool_maxsize'] = pool_maxsize
+        if max_concurrency is not None:
+            adapter_kwargs['max_concurrency'] = max_concurrency
+        if http_cache is not None:
+            adapter_kwargs['http_cache'] = http_cache
+        if retry is not None:
+            adapter_kwargs['retry'] = retry
+        if replay_from is not None:
+            adapter_kwargs['transport'] = HARReplayAdapter(replay_from)
+        if adapter_kwargs:
+            self._mount_adapter(**adapter_kwargs)
+        self.metrics = metrics
+        if metrics is not None:
+            metrics.attach(self)
+        if record_to is not None:
+            self.recorder = HARRecorder(record_to)
+            self.on_response(self.recorder.on_response)
         self.projects = Manager(
             teamcity=self,
             query_set_factory=ProjectQuerySet)
@@ -104,6 +178,53 @@ class TeamCity(object):
             self.base_url = self.base_base_url + '/guestAuth'
             self.auth = None
 
+    def _mount_adapter(self, **kwargs):
+        if not self._own_session and 'transport' not in kwargs:
+            kwargs['transport'] = MountedAdapters(dict(
+                (prefix, self.session.adapters[prefix])
+                for prefix in ('https://', 'http://')
+                if prefix in self.session.adapters))
+        self.adapter = TeamCityAdapter(**kwargs)
+        self.session.mount('http://', self.adapter)
+        self.session.mount('https://', self.adapter)
+
+    def _get_adapter(self):
+        if self.adapter is None:
+            self._mount_adapter()
+        return self.adapter
+
+    def on_request(self, hook):
+        """
+        Call `hook(request)` with every `requests.PreparedRequest` sent
+        through `session`. Returns `hook`, so can be used as a decorator.
+        """
+        self._get_adapter().request_hooks.append(hook)
+        return hook
+
+    def on_response(self, hook):
+        """
+        Call `hook(response)` with every `requests.Response` received
+        through `session`. Returns `hook`, so can be used as a decorator.
+        """
+        self._get_adapter().response_hooks.append(hook)
+        return hook
+
+    @contextlib.contextmanager
+    def detect_n_plus_one(self, threshold=10, action='warn'):
+        """
+        Warn, or raise `exceptions.NPlusOneError` if `action` is `'raise'`,
+        when more than `threshold` requests of the same shape are made in
+        the block, e.g. by reading `build.build_type` of every build.
+        Yields the `NPlusOneDetector` counting them.
+        """
+        detector = NPlusOneDetector(threshold=threshold, action=action)
+        hooks = self._get_adapter().request_hooks
+        hooks.append(detector.on_request)
+        try:
+            yield detector
+        finally:
+            hooks.remove(detector.on_request)
+
     def relative_url(self, uri):
         return '%s/%s' % (self.base_url, uri)
 
@@ -5,6 +5,10 @@ from .core.queryset import QuerySet
 
 
 class Test(object):
+    __slots__ = (
+        'build_id', 'test_id', 'name', 'status', 'muted', 'duration', 'href',
+        'test_query_set', 'teamcity', '_data_dict', '_related')
+
     def __init__(self, id, name, status, muted, duration, href,
                  test_query_set, teamcity, data_dict=None):
         try:
@@ -55,24 +59,24 @@ class Test(object):
 class TestQuerySet(QuerySet):
     uri = '/app/rest/testOccurrences/'
     _entity_factory = Test
+    _data_key = 'testOccurrence'
 
     def filter(self,
                build_id=None, status=None):
+        query_set = self._clone()
         if build_id is not None:
-            self._add_pred('build', f'(id:{build_id})')
+            query_set._add_pred('build', f'(id:{build_id})')
         if status is not None:
-            self._add_pred('status', status)
-        return self
-
-    def __iter__(self):
-        try:
-            return (Test.from_dict(d, self, teamcity=self.teamcity)
-                    for d in self._data()['testOccurrence'])
-        except KeyError:
-            return iter(())
+            query_set._add_pred('status', status)
+        return query_set
         
 
 class TestDetail(object):
+    __slots__ = (
+        'id', 'name', 'status', 'muted', 'duration', 'href', 'details',
+        'ignore_details', 'test_detail_query_set', 'teamcity', 'build', 'test',
+        '_data_dict', '_related')
+
     def __init__(self, id, name, status, muted, duration, href, details, ignore_details,
                  test, build, test_detail_query_set, teamcity, data_dict=None):
         self.id = id
@@ -124,8 +128,9 @@ class TestDetailQuerySet(QuerySet):
     
     def filter(self,
                test_id=None, build_id=None):
+        query_set = self._clone()
         if test_id is not None:
-            self._add_pred('id', test_id)
+            query_set._add_pred('id', test_id)
         if build_id is not None:
-            self._add_pred('build', f'(id:{build_id})')
-        return self
+            query_set._add_pred('build', f'(id:{build_id})')
+        return query_set
@@ -0,0 +1,136 @@
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+import requests
+import responses
+from requests.adapters import BaseAdapter, HTTPAdapter
+
+from pyteamcity.future import exceptions, TeamCity
+
+
+def test_no_adapter_by_default():
+    tc = TeamCity()
+    assert tc.adapter is None
+
+
+def test_pool_size():
+    tc = TeamCity(pool_connections=4, pool_maxsize=64)
+    assert tc.session.get_adapter('http://127.0.0.1/') is tc.adapter
+    assert tc.session.get_adapter('https://127.0.0.1/') is tc.adapter
+    assert tc.adapter.poolmanager.connection_pool_kw['maxsize'] == 64
+
+
+class RecordingAdapter(HTTPAdapter):
+    def __init__(self, **kwargs):
+        super(RecordingAdapter, self).__init__(**kwargs)
+        self.urls = []
+
+    def send(self, request, **kwargs):
+        self.urls.append(request.url)
+        return super(RecordingAdapter, self).send(request, **kwargs)
+
+
+@responses.activate
+def test_keeps_adapters_mounted_on_session():
+    session = requests.Session()
+    adapter = RecordingAdapter(max_retries=5)
+    session.mount('http://', adapter)
+    tc = TeamCity(session=session, max_concurrency=2)
+    hooked = tc.on_request(lambda request: None)
+    responses.add(
+        responses.GET, tc.relative_url('app/rest/agents/'),
+        json={'count': 0, 'agent': []},
+    )
+
+    list(tc.agents.all())
+
+    assert session.get_adapter('http://127.0.0.1/') is tc.adapter
+    assert tc.adapter.request_hooks == [hooked]
+    assert adapter.urls == [tc.relative_url('app/rest/agents/')]
+
+
+def test_pool_size_with_session():
+    with pytest.raises(exceptions.IllegalOperation):
+        TeamCity(session=requests.Session(), pool_maxsize=16)
+
+
+@responses.activate
+def test_max_concurrency():
+    tc = TeamCity(max_concurrency=2)
+    lock = threading.Lock()
+    in_flight = [0]
+    peak = [0]
+
+    def request_callback(request):
+        with lock:
+            in_flight[0] += 1
+            peak[0] = max(peak[0], in_flight[0])
+        time.sleep(0.02)
+        with lock:
+            in_flight[0] -= 1
+        return (200, {}, json.dumps({'count': 0, 'agent': []}))
+
+    responses.add_callback(
+        responses.GET,
+        tc.relative_url('app/rest/agents/'),
+        callback=request_callback,
+        content_type='application/json',
+    )
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        list(executor.map(lambda _: list(tc.agents.all()), range(16)))
+
+    assert len(responses.calls) == 16
+    assert peak[0] == 2
+
+
+class SlowBodyTransport(BaseAdapter):
+    """Serves responses whose bodies take a while to download"""
+
+    def __init__(self):
+        super(SlowBodyTransport, self).__init__()
+        self.lock = threading.Lock()
+        self.downloading = 0
+        self.peak = 0
+
+    def send(self, request, **kwargs):
+        transport = self
+        with self.lock:
+            self.downloading += 1
+            self.peak = max(self.peak, self.downloading)
+
+        class Body(object):
+            done = False
+
+            def read(self, *args, **kwargs):
+                if self.done:
+                    return b''
+                time.sleep(0.02)
+                self.done = True
+                with transport.lock:
+                    transport.downloading -= 1
+                return b'{"count": 0, "agent": []}'
+
+        response = requests.Response()
+        response.status_code = 200
+        response.raw = Body()
+        response.request = request
+        response.url = request.url
+        return response
+
+    def close(self):
+        pass
+
+
+def test_max_concurrency_covers_body_downloads():
+    tc = TeamCity(max_concurrency=2)
+    transport = SlowBodyTransport()
+    tc.adapter.transport = transport
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        list(executor.map(lambda _: list(tc.agents.all()), range(16)))
+
+    assert transport.peak == 2
@@ -0,0 +1,199 @@
+import asyncio
+
+import pytest
+
+from pyteamcity.future import AsyncTeamCity, exceptions
+from pyteamcity.future.build import Build
+
+
+class FakeResponse(object):
+    def __init__(self, status, json_data):
+        self.status = status
+        self.reason = 'Not Found' if status == 404 else 'OK'
+        self._json_data = json_data
+
+    async def json(self, content_type='application/json'):
+        return self._json_data
+
+    async def text(self):
+        return str(self._json_data)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        pass
+
+
+class FakeSession(object):
+    """Stands in for an `aiohttp.ClientSession`, serving canned pages"""
+
+    def __init__(self, responses):
+        self.responses = responses
+        self.urls = []
+        self.closed = False
+
+    def get(self, url):
+        self.urls.append(url)
+        for suffix, (status, json_data) in self.responses.items():
+            if url.endswith(suffix):
+                return FakeResponse(status, json_data)
+        return FakeResponse(404, {})
+
+    async def close(self):
+        self.closed = True
+
+
+def _run(coro):
+    return asyncio.run(coro)
+
+
+def test_get():
+    session = FakeSession({
+        '/app/rest/builds/id:1': (200, {'id': 1, 'number': '7'}),
+    })
+    tc = AsyncTeamCity(async_session=session)
+
+    build = _run(tc.builds.all().get(id=1))
+
+    assert isinstance(build, Build)
+    assert build.id == 1
+    assert build.number == '7'
+    assert build.teamcity is tc
+
+
+def test_iterator_follows_next_href():
+    session = FakeSession({
+        '/app/rest/builds/?locator=running:True': (200, {
+            'count': 2,
+            'build': [{'id': 1}, {'id': 2}],
+            'nextHref': '/guestAuth/app/rest/builds/?locator=running:True,start:2',
+        }),
+        '/app/rest/builds/?locator=running:True,start:2': (200, {
+            'count': 1,
+            'build': [{'id': 3}],
+        }),
+    })
+    tc = AsyncTeamCity(async_session=session)
+
+    async def collect():
+        query_set = tc.builds.all().filter(running=True)
+        return [build.id async for build in query_set.iterator()]
+
+    assert _run(collect()) == [1, 2, 3]
+    assert len(session.urls) == 2
+
+
+def test_async_for_and_count():
+    session = FakeSession({
+        '/app/rest/agents/': (200, {
+            'count': 2,
+            'agent': [{'id': 1, 'name': 'a'}, {'id': 2, 'name': 'b'}],
+        }),
+    })
+    tc = AsyncTeamCity(async_session=session)
+
+    async def collect():
+        query_set = tc.agents.all()
+        names = [agent.name async for agent in query_set]
+        return names, await query_set.count()
+
+    assert _run(collect()) == (['a', 'b'], 2)
+    assert len(session.urls) == 1
+
+
+def test_http_error():
+    tc = AsyncTeamCity(async_session=FakeSession({}))
+
+    with pytest.raises(exceptions.HTTPError) as excinfo:
+        _run(tc.projects.all().get(id='missing'))
+
+    assert excinfo.value.status_code == 404
+
+
+def test_close():
+    session = FakeSession({})
+
+    async def use():
+        async with AsyncTeamCity(async_session=session):
+            pass
+
+    _run(use())
+    assert session.closed
+
+
+def test_in_bulk():
+    session = FakeSession({
+        '/app/rest/buildTypes/?locator=item:(id:bt1),item:(id:bt2)'
+        '&fields=count,buildType($long)': (200, {
+            'count': 2,
+            'buildType': [{'id': 'bt1'}, {'id': 'bt2'}],
+        }),
+    })
+    tc = AsyncTeamCity(async_session=session)
+
+    found = _run(tc.build_types.all().in_bulk(['bt1', 'bt2', 'bt1']))
+
+    assert sorted(found) == ['bt1', 'bt2']
+    assert len(session.urls) == 1
+
+
+def test_prefetch_related_fetches_asynchronously():
+    session = FakeSession({
+        '/app/rest/builds/': (200, {
+            'count': 2,
+            'build': [{'id': 1, 'buildTypeId': 'bt1'},
+                      {'id': 2, 'buildTypeId': 'bt1'}],
+        }),
+        '/app/rest/buildTypes/?locator=item:(id:bt1)'
+        '&fields=count,buildType($long)': (200, {
+            'count': 1,
+            'buildType': [{'id': 'bt1', 'name': 'Py27'}],
+        }),
+    })
+    tc = AsyncTeamCity(async_session=session)
+    tc.session = None  # the blocking session must not be used
+
+    async def collect():
+        query_set = tc.builds.all().prefetch_related('build_type')
+        return [build async for build in query_set.iterator()]
+
+    builds = _run(collect())
+
+    assert [build.build_type.name for build in builds] == ['Py27', 'Py27']
+    assert len(session.urls) == 2
+
+
+@pytest.mark.parametrize('use', [
+    lambda query_set: query_set[0],
+    lambda query_set: query_set[1:3],
+    lambda query_set: query_set.to_columns(['id']),
+    lambda query_set: query_set.to_dataframe(['id']),
+    lambda query_set: _run(query_set.fetch_all(parallel=4)),
+])
+def test_unsupported_operations(use):
+    tc = AsyncTeamCity(async_session=FakeSession({}))
+
+    with pytest.raises(exceptions.IllegalOperation):
+        use(tc.builds.all())
+
+
+@pytest.mark.parametrize('option', [
+    'max_concurrency', 'retry', 'http_cache', 'single_flight', 'metrics',
+    'record_to', 'replay_from'])
+def test_unsupported_options(option):
+    with pytest.raises(exceptions.IllegalOperation) as excinfo:
+        AsyncTeamCity(async_session=FakeSession({}), **{option: object()})
+
+    assert option in str(excinfo.value)
+
+
+def test_unsupported_hooks():
+    tc = AsyncTeamCity(async_session=FakeSession({}))
+
+    with pytest.raises(exceptions.IllegalOperation):
+        tc.on_request(lambda request: None)
+    with pytest.raises(exceptions.IllegalOperation):
+        tc.on_response(lambda response: None)
+    with pytest.raises(exceptions.IllegalOperation):
+        tc.detect_n_plus_one()
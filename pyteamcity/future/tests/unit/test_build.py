@@ -1,4 +1,5 @@
 import datetime
+import json
 
 import pytest
 import responses
@@ -796,3 +797,127 @@ def _builds_equal(a, b):
     ]
 
     return all(trues)
+
+
+def test_unit_only():
+    builds = tc.builds.all().filter(running=True).only(
+        'id', 'status', 'agent(name)')
+    url = builds._get_url()
+    assert url.endswith(
+        '?locator=running:True'
+        '&fields=count,href,nextHref,prevHref,build(id,status,agent(name))')
+
+
+def test_unit_get_by_id_only():
+    url = tc.builds.all().only('id', 'finishDate').get(id=1, just_url=True)
+    assert url.endswith('/app/rest/builds/id:1?fields=id,finishDate')
+
+
+@responses.activate
+def test_only_with_responses():
+    responses.add(
+        responses.GET,
+        tc.relative_url('app/rest/builds/'),
+        json={'count': 1, 'build': [{'id': 1, 'status': 'SUCCESS'}]},
+        status=200,
+        content_type='application/json',
+    )
+
+    builds = list(tc.builds.all().only('id', 'status'))
+
+    assert 'fields=' in responses.calls[0].request.url
+    assert builds[0].status == 'SUCCESS'
+    assert builds[0].number is None
+    assert builds[0].agent is None
+
+
+def test_unit_select_related():
+    builds = tc.builds.all().select_related('build_type', 'agent')
+    assert builds._get_url().endswith(
+        '?fields=count,href,nextHref,prevHref,'
+        'build($short,buildType($short),agent($short))')
+
+
+def test_unit_select_related_invalid():
+    with pytest.raises(exceptions.IllegalOperation):
+        tc.builds.all().select_related('nonsense')
+    with pytest.raises(exceptions.IllegalOperation):
+        tc.builds.all().prefetch_related('agent')
+
+
+@responses.activate
+def test_select_related_with_responses():
+    responses.add(
+        responses.GET,
+        tc.relative_url('app/rest/builds/'),
+        json={'count': 1, 'build': [{
+            'id': 1, 'buildTypeId': 'bt1',
+            'buildType': {'id': 'bt1', 'name': 'Py27', 'projectId': 'p1'},
+        }]},
+        status=200,
+        content_type='application/json',
+    )
+
+    builds = list(tc.builds.all().select_related('build_type'))
+
+    assert builds[0].build_type.name == 'Py27'
+    assert builds[0].build_type.project_id == 'p1'
+    assert len(responses.calls) == 1
+
+
+@responses.activate
+def test_prefetch_related_with_responses():
+    responses.add(
+        responses.GET,
+        tc.relative_url('app/rest/builds/'),
+        json={'count': 3, 'build': [
+            {'id': 1, 'buildTypeId': 'bt1'},
+            {'id': 2, 'buildTypeId': 'bt2'},
+            {'id': 3, 'buildTypeId': 'bt1'},
+        ]},
+        status=200,
+        content_type='application/json',
+    )
+    responses.add(
+        responses.GET,
+        tc.relative_url('app/rest/buildTypes/'),
+        json={'count': 2, 'buildType': [
+            {'id': 'bt1', 'name': 'Py27'},
+            {'id': 'bt2', 'name': 'Py35'},
+        ]},
+        status=200,
+        content_type='application/json',
+    )
+
+    builds = list(tc.builds.all().prefetch_related('build_type'))
+
+    assert [b.build_type.name for b in builds] == ['Py27', 'Py35', 'Py27']
+    assert len(responses.calls) == 2
+    assert 'locator=item:(id:bt1),item:(id:bt2)' in (
+        responses.calls[1].request.url)
+
+
+@responses.activate
+def test_in_bulk_with_responses():
+    def request_callback(request):
+        locator = request.url.split('locator=')[1].split('&')[0]
+        ids = [int(pred[len('item:(id:'):-1])
+               for pred in locator.split(',') if pred.startswith('item:')]
+        return (200, {}, json.dumps({
+            'count': len(ids),
+            'build': [{'id': id, 'number': str(id)} for id in ids if id < 5],
+        }))
+
+    responses.add_callback(
+        responses.GET,
+        tc.relative_url('app/rest/builds/'),
+        callback=request_callback,
+        content_type='application/json',
+    )
+
+    builds = tc.builds.all().in_bulk([1, 2, 3, 2, 4, 5], chunk_size=2)
+
+    assert sorted(builds) == [1, 2, 3, 4]
+    assert builds[3].number == '3'
+    assert len(responses.calls) == 3
+    assert 'count:2' in responses.calls[0].request.url
@@ -0,0 +1,80 @@
+import responses
+
+from pyteamcity.future import BuildStore, TeamCity
+
+
+def test_get_and_set(tmp_path):
+    store = BuildStore(str(tmp_path / 'builds.sqlite'))
+    assert store.get(1) is None
+
+    store.set(1, 'build', {'id': 1, 'state': 'finished'})
+
+    assert store.get(1) == {'id': 1, 'state': 'finished'}
+    assert store.get('1', 'build') == {'id': 1, 'state': 'finished'}
+    assert store.get(1, 'resulting-properties') is None
+
+
+def test_persists(tmp_path):
+    path = str(tmp_path / 'builds.sqlite')
+    store = BuildStore(path)
+    store.set(1, 'build', {'id': 1})
+    store.close()
+
+    assert BuildStore(path).get(1) == {'id': 1}
+
+
+def test_evicts_least_recently_read(tmp_path):
+    store = BuildStore(str(tmp_path / 'builds.sqlite'), max_size=60)
+    store.set(1, 'build', {'padding': 'x' * 10})
+    store.set(2, 'build', {'padding': 'y' * 10})
+    store.get(1)
+    store.set(3, 'build', {'padding': 'z' * 10})
+
+    assert len(store) == 2
+    assert store.get(2) is None
+    assert store.get(1) is not None
+    assert store.get(3) is not None
+
+
+@responses.activate
+def test_finished_builds_are_stored(tmp_path):
+    tc = TeamCity(build_store=BuildStore(str(tmp_path / 'builds.sqlite')))
+    responses.add(
+        responses.GET,
+        tc.relative_url('app/rest/builds/id:1'),
+        json={'id': 1, 'state': 'finished',
+              'href': '/guestAuth/app/rest/builds/id:1'},
+        status=200,
+        content_type='application/json',
+    )
+    responses.add(
+        responses.GET,
+        tc.relative_url('app/rest/builds/id:1/resulting-properties'),
+        json={'property': [{'name': 'env.FOO', 'value': 'bar'}]},
+        status=200,
+        content_type='application/json',
+    )
+
+    for _ in range(2):
+        build = tc.builds.all().get(id=1)
+        assert build.resulting_properties['env.FOO'].value == 'bar'
+
+    assert len(responses.calls) == 2
+
+
+@responses.activate
+def test_running_builds_are_not_stored(tmp_path):
+    tc = TeamCity(build_store=BuildStore(str(tmp_path / 'builds.sqlite')))
+    responses.add(
+        responses.GET,
+        tc.relative_url('app/rest/builds/id:1'),
+        json={'id': 1, 'state': 'running'},
+        status=200,
+        content_type='application/json',
+    )
+
+    tc.builds.all().get(id=1)
+    tc.builds.all().get(id=1)
+
+    assert len(responses.calls) == 2
+    assert len(tc.build_store) == 0
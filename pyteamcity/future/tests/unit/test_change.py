@@ -1,4 +1,5 @@
 import datetime
+import json
 
 import responses
 
@@ -7,6 +8,25 @@ from pyteamcity.future import TeamCity
 tc = TeamCity()
 
 
+def _add_changes(changes_json):
+    """Serve `changes_json`, honouring the `start` and `count` dimensions"""
+
+    def request_callback(request):
+        preds = dict(pred.split(':', 1) for pred in
+                     request.url.split('locator=')[1].split('&')[0].split(','))
+        start = int(preds.get('start', 0))
+        count = int(preds.get('count', len(changes_json['change'])))
+        page = changes_json['change'][start:start + count]
+        return (200, {}, json.dumps({'count': len(page), 'change': page}))
+
+    responses.add_callback(
+        responses.GET,
+        tc.relative_url('app/rest/changes/'),
+        callback=request_callback,
+        content_type='application/json',
+    )
+
+
 def test_unit_get_all():
     changes = tc.changes.all()
     assert changes._get_url().endswith('/app/rest/changes/')
@@ -183,12 +203,7 @@ def test_filter_by_build():
             },
         ],
     }
-    responses.add(
-        responses.GET,
-        tc.relative_url('app/rest/changes/'),
-        json=changes_json, status=200,
-        content_type='application/json',
-    )
+    _add_changes(changes_json)
 
     changes = tc.changes.all().filter(
         build=802245,
@@ -220,12 +235,7 @@ def test_filter_by_vcs_root():
             },
         ],
     }
-    responses.add(
-        responses.GET,
-        tc.relative_url('app/rest/changes/'),
-        json=changes_json, status=200,
-        content_type='application/json',
-    )
+    _add_changes(changes_json)
 
     changes = tc.changes.all().filter(
         vcs_root='AppRouter_Inventory',
@@ -259,12 +269,7 @@ def test_filter_by_username():
             },
         ],
     }
-    responses.add(
-        responses.GET,
-        tc.relative_url('app/rest/changes/'),
-        json=changes_json, status=200,
-        content_type='application/json',
-    )
+    _add_changes(changes_json)
 
     changes = tc.changes.all().filter(
         username='marca',
@@ -298,12 +303,7 @@ def test_filter_by_version():
             },
         ],
     }
-    responses.add(
-        responses.GET,
-        tc.relative_url('app/rest/changes/'),
-        json=changes_json, status=200,
-        content_type='application/json',
-    )
+    _add_changes(changes_json)
 
     changes = tc.changes.all().filter(
         version='09f63026bad685bc44bbf6b44ba35f8eb18748ca',
@@ -0,0 +1,134 @@
+import json
+
+from six.moves.urllib.parse import unquote
+
+import pytest
+import responses
+
+from pyteamcity.future import TeamCity
+
+numpy = pytest.importorskip('numpy')
+
+tc = TeamCity()
+
+PAGES = [
+    {
+        'count': 2,
+        'nextHref': '/guestAuth/app/rest/builds/?locator=count:2,start:2',
+        'build': [
+            {'id': 1, 'status': 'SUCCESS', 'number': '1',
+             'startDate': '20160101T120000+0000',
+             'finishDate': '20160101T130000+0100'},
+            {'id': 2, 'status': 'FAILURE', 'number': '2',
+             'startDate': '20160102T120000+0000'},
+        ],
+    },
+    {
+        'count': 1,
+        'build': [
+            {'id': 3, 'status': 'SUCCESS', 'number': '3',
+             'startDate': '20160103T120000-0130',
+             'finishDate': '20160103T140000-0130'},
+        ],
+    },
+]
+
+
+def _add_pages():
+    for page in PAGES:
+        responses.add(
+            responses.GET, tc.relative_url('app/rest/builds/'),
+            json=page, status=200)
+
+
+@responses.activate
+def test_to_columns():
+    _add_pages()
+
+    columns = tc.builds.all().to_columns(
+        ['id', 'status', 'number', 'startDate', 'finishDate'])
+
+    assert list(columns) == [
+        'id', 'status', 'number', 'startDate', 'finishDate']
+    assert columns['id'].dtype == numpy.int64
+    assert columns['id'].tolist() == [1, 2, 3]
+    assert columns['status'].codes.tolist() == [0, 1, 0]
+    assert columns['status'].categories == ['SUCCESS', 'FAILURE']
+    assert columns['number'].dtype == object
+    assert columns['number'].tolist() == ['1', '2', '3']
+    assert columns['startDate'].dtype == numpy.dtype('datetime64[s]')
+    assert columns['startDate'].tolist()[2].isoformat() == \
+        '2016-01-03T13:30:00'
+    finish_dates = columns['finishDate']
+    assert str(finish_dates[0]) == '2016-01-01T12:00:00'
+    assert numpy.isnat(finish_dates[1])
+    assert str(finish_dates[2]) == '2016-01-03T15:30:00'
+
+    assert len(responses.calls) == 2
+    url = unquote(responses.calls[0].request.url)
+    assert 'build(id,status,number,startDate,finishDate)' in url
+
+
+@responses.activate
+def test_to_columns_missing_values():
+    responses.add(
+        responses.GET, tc.relative_url('app/rest/builds/'),
+        json={'count': 3, 'build': [
+            {'id': 1, 'size': 10},
+            {'id': 2, 'startDate': '2016-01-01T12:00:00+01:00'},
+            {'id': 3, 'size': 30}]},
+        status=200)
+
+    columns = tc.builds.all().to_columns(['size', 'status', 'startDate'])
+
+    assert columns['size'].dtype == numpy.float64
+    assert columns['size'][0] == 10 and numpy.isnan(columns['size'][1])
+    assert columns['status'].codes.tolist() == [-1, -1, -1]
+    assert columns['status'].categories == []
+    assert str(columns['startDate'][1]) == '2016-01-01T11:00:00'
+
+
+@pytest.mark.parametrize('date', [
+    '20161332T120000+0000', '20160231T120000+0000', '20160101T240000+0000',
+    '20160101T126000+0000', '20160101T120060+0000'])
+@responses.activate
+def test_to_columns_invalid_date(date):
+    responses.add(
+        responses.GET, tc.relative_url('app/rest/builds/'),
+        json={'count': 2, 'build': [
+            {'id': 1, 'startDate': '20160101T120000+0000'},
+            {'id': 2, 'startDate': date}]},
+        status=200)
+
+    with pytest.raises(ValueError):
+        tc.builds.all().to_columns(['startDate'])
+
+
+@responses.activate
+def test_to_columns_empty():
+    responses.add(
+        responses.GET, tc.relative_url('app/rest/builds/'),
+        body=json.dumps({'count': 0}), status=200,
+        content_type='application/json')
+
+    columns = tc.builds.all().to_columns(['id', 'status', 'finishDate'])
+
+    assert len(columns['id']) == 0
+    assert len(columns['status'].codes) == 0
+    assert columns['finishDate'].dtype == numpy.dtype('datetime64[s]')
+
+
+@responses.activate
+def test_to_dataframe():
+    pandas = pytest.importorskip('pandas')
+    _add_pages()
+
+    df = tc.builds.all().to_dataframe(['id', 'status', 'finishDate'])
+
+    assert list(df.columns) == ['id', 'status', 'finishDate']
+    assert df['id'].tolist() == [1, 2, 3]
+    assert isinstance(df['status'].dtype, pandas.CategoricalDtype)
+    assert df['status'].tolist() == ['SUCCESS', 'FAILURE', 'SUCCESS']
+    assert str(df['finishDate'].dt.tz) == 'UTC'
+    assert df['finishDate'][0] == pandas.Timestamp('2016-01-01T12:00:00Z')
+    assert pandas.isna(df['finishDate'][1])
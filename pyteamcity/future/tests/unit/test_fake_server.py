@@ -0,0 +1,131 @@
+import pytest
+import requests
+
+from pyteamcity.future import exceptions
+from pyteamcity.future.fake_server import DataGenerator, FakeTeamCityServer
+
+
+@pytest.fixture(scope='module')
+def server():
+    generator = DataGenerator(
+        seed=1, projects=3, build_types=10, builds=250, queued_builds=5,
+        agents=4, agent_pools=2, tests_per_build=30, artifacts_per_build=2)
+    with FakeTeamCityServer(generator) as server:
+        yield server
+
+
+def test_data_generator_is_deterministic():
+    generator = DataGenerator(seed=1)
+    assert generator.entity('builds', 42) == DataGenerator(seed=1).entity(
+        'builds', 42)
+    assert generator.entity('builds', 42) != DataGenerator(seed=2).entity(
+        'builds', 42)
+    assert generator.entity('builds', 10000) is None
+    assert generator.index('buildTypes', 'bt7') == 7
+    assert generator.index('buildTypes', 'bt100') is None
+
+
+def test_builds_paging(server):
+    tc = server.teamcity()
+    query_set = tc.builds.all()
+
+    builds = list(query_set.iterator())
+
+    assert query_set.count() == 100
+    assert tc.builds.all().filter(count=1000).count() == 250
+    assert [build.id for build in builds] == list(range(250, 0, -1))
+    assert builds[0].state == 'running'
+    assert builds[-1].state == 'finished'
+
+
+def test_builds_stream(server):
+    tc = server.teamcity()
+
+    builds = list(tc.builds.all().filter(count=1000).iterator(stream=True))
+
+    assert [build.id for build in builds] == list(range(250, 0, -1))
+    assert builds[-1].state == 'finished'
+
+
+def test_builds_filter(server):
+    tc = server.teamcity()
+    query_set = tc.builds.all().filter(build_type='id:bt3')
+
+    assert query_set.count() == 25
+    assert {build.build_type_id for build in query_set.iterator()} == {'bt3'}
+    failures = tc.builds.all().filter(status='FAILURE', count=1000)
+    assert 0 < failures.count() < 250
+    assert tc.builds.all().filter(running=True).count() == 2
+
+
+def test_slicing_and_in_bulk(server):
+    tc = server.teamcity()
+
+    assert [build.id for build in tc.builds.all()[10:13]] == [240, 239, 238]
+    assert sorted(tc.builds.all().in_bulk([1, 2, 3, 1000])) == [1, 2, 3]
+
+
+def test_get_and_related(server):
+    tc = server.teamcity()
+
+    build = tc.builds.all().get(id=12)
+
+    assert build.build_type_id == 'bt1'
+    assert build.build_type.project.id == 'Project1'
+    assert build.finish_date is not None
+    assert tc.agents.all().get(id=build.agent.id).pool.name.startswith('Pool')
+    assert build.resulting_properties['env.BUILD_ID'].value == '12'
+    with pytest.raises(exceptions.HTTPError) as excinfo:
+        tc.builds.all().get(id=1000)
+    assert excinfo.value.status_code == 404
+
+
+def test_only_and_select_related(server):
+    tc = server.teamcity()
+
+    builds = list(
+        tc.builds.all().only('id', 'number').select_related('build_type')[:3])
+
+    assert builds[0].status is None
+    assert builds[0].build_type.id == 'bt9'
+
+
+def test_artifacts(server):
+    tc = server.teamcity()
+    build = tc.builds.all().get(id=5)
+
+    names = [artifact.name for artifact in build.artifacts.listdir()]
+    log = build.artifacts / 'logs/build.log'
+
+    assert names == ['logs', 'file0.txt', 'file1.txt']
+    assert log.size == len(log.content()) == 2048
+    with pytest.raises(exceptions.ArtifactNotFound):
+        build.artifacts / 'missing.txt'
+
+
+def test_tests_and_changes(server):
+    tc = server.teamcity()
+
+    tests = list(tc.tests.all().filter(build_id=5))
+    changes = list(tc.changes.all().filter(build='id:5'))
+
+    assert len(tests) == 30
+    assert {test.build_id for test in tests} == {'5'}
+    assert tests[0].detail.name == tests[0].name
+    assert [change.id for change in changes] == [5]
+
+
+def test_other_collections(server):
+    tc = server.teamcity()
+
+    assert len(list(tc.projects.all())) == 3
+    assert len(list(tc.build_types.all().filter(project_id='Project0'))) == 4
+    assert [agent.name for agent in tc.agent_pools.all().get(id=1).agents] == [
+        'agent-2', 'agent-4']
+    assert len(list(tc.queued_builds.all())) == 5
+    assert tc.server_info.version_major == 2023
+
+
+def test_unknown_endpoint(server):
+    res = requests.get(server.url + '/guestAuth/app/rest/nothing')
+    assert res.status_code == 404
@@ -0,0 +1,100 @@
+import json
+import os
+import tempfile
+
+import pytest
+import requests
+import responses
+
+from pyteamcity.future import HARRecorder, TeamCity
+
+
+def _record(path):
+    tc = TeamCity(username='user', password='secret', record_to=path)
+    with responses.RequestsMock() as rsps:
+        rsps.add(
+            responses.GET,
+            tc.relative_url('app/rest/builds/id:1'),
+            json={'id': 1, 'number': '42', 'buildTypeId': 'bt1',
+                  'href': '/httpAuth/app/rest/builds/id:1'},
+        )
+        rsps.add(
+            responses.GET,
+            tc.relative_url('app/rest/builds/id:1/artifacts/content/data.bin'),
+            body=b'\x00\xff\x10',
+            content_type='application/octet-stream',
+        )
+        build = tc.builds.all().get(id=1)
+        content = tc.session.get(
+            tc.relative_url('app/rest/builds/id:1/artifacts/content/data.bin'),
+            stream=True).content
+    tc.recorder.close()
+    return build, content
+
+
+def test_record():
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'session.har')
+        _record(path)
+        with open(path) as f:
+            har = json.load(f)
+
+    entries = har['log']['entries']
+    assert har['log']['version'] == '1.2'
+    assert [entry['request']['url'] for entry in entries] == [
+        'http://127.0.0.1/httpAuth/app/rest/builds/id:1',
+        'http://127.0.0.1/httpAuth/app/rest/builds/id:1/artifacts/content'
+        '/data.bin',
+    ]
+    headers = dict(
+        (header['name'], header['value'])
+        for header in entries[0]['request']['headers'])
+    assert headers['Authorization'] == '[redacted]'
+    assert entries[0]['response']['status'] == 200
+    assert json.loads(entries[0]['response']['content']['text'])['id'] == 1
+    assert entries[1]['response']['content']['encoding'] == 'base64'
+
+
+def test_replay():
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'session.har')
+        recorded_build, recorded_content = _record(path)
+
+        tc = TeamCity(username='user', password='secret', replay_from=path)
+        with responses.RequestsMock():
+            build = tc.builds.all().get(id=1)
+            content = tc.session.get(tc.relative_url(
+                'app/rest/builds/id:1/artifacts/content/data.bin')).content
+
+            with pytest.raises(requests.ConnectionError):
+                tc.builds.all().get(id=2)
+
+    assert build.number == recorded_build.number == '42'
+    assert content == recorded_content == b'\x00\xff\x10'
+
+
+@responses.activate
+def test_record_spools_entries():
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'session.har')
+        recorder = HARRecorder(path)
+        responses.add(
+            responses.GET, 'http://127.0.0.1/guestAuth/app/rest/server',
+            json={'version': '2017.1'},
+        )
+        session = requests.Session()
+        session.hooks['response'].append(
+            lambda response, **kwargs: recorder.on_response(response))
+
+        session.get('http://127.0.0.1/guestAuth/app/rest/server')
+        recorder.save()
+        with open(path) as f:
+            assert len(json.load(f)['log']['entries']) == 1
+        session.get('http://127.0.0.1/guestAuth/app/rest/server')
+        recorder.close()
+        with open(path) as f:
+            har = json.load(f)
+
+    assert recorder.count == 2
+    assert len(har['log']['entries']) == 2
+    assert isinstance(har['log']['creator']['version'], str)
@@ -0,0 +1,65 @@
+import json
+
+import responses
+
+from pyteamcity.future import FileCacheStore, HTTPCache, TeamCity
+
+
+def _add_conditional_agents(tc, etag='"v1"'):
+    body = {'count': 1, 'agent': [{'id': 1, 'name': 'agent1'}]}
+
+    def request_callback(request):
+        if request.headers.get('If-None-Match') == etag:
+            return (304, {'ETag': etag}, '')
+        return (200, {'ETag': etag}, json.dumps(body))
+
+    responses.add_callback(
+        responses.GET,
+        tc.relative_url('app/rest/agents/'),
+        callback=request_callback,
+        content_type='application/json',
+    )
+
+
+@responses.activate
+def test_not_modified_is_served_from_cache():
+    tc = TeamCity(http_cache=HTTPCache())
+    _add_conditional_agents(tc)
+
+    first = [agent.name for agent in tc.agents.all()]
+    second = [agent.name for agent in tc.agents.all()]
+
+    assert first == second == ['agent1']
+    assert responses.calls[1].response.status_code == 304
+    assert (tc.http_cache.hits, tc.http_cache.misses) == (1, 1)
+
+
+@responses.activate
+def test_responses_without_validators_are_not_cached():
+    tc = TeamCity(http_cache=HTTPCache())
+    responses.add(
+        responses.GET,
+        tc.relative_url('app/rest/agents/'),
+        json={'count': 0, 'agent': []}, status=200,
+        content_type='application/json',
+    )
+
+    len(tc.agents.all())
+    len(tc.agents.all())
+
+    assert 'If-None-Match' not in responses.calls[1].request.headers
+    assert (tc.http_cache.hits, tc.http_cache.misses) == (0, 2)
+
+
+@responses.activate
+def test_file_cache_store_persists(tmp_path):
+    store = FileCacheStore(str(tmp_path))
+    tc = TeamCity(http_cache=HTTPCache(store=store))
+    _add_conditional_agents(tc)
+    list(tc.agents.all())
+
+    tc = TeamCity(http_cache=HTTPCache(store=FileCacheStore(str(tmp_path))))
+    agents = list(tc.agents.all())
+
+    assert agents[0].name == 'agent1'
+    assert tc.http_cache.hits == 1
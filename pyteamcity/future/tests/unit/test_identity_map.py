@@ -0,0 +1,157 @@
+import re
+
+import pytest
+import responses
+
+from pyteamcity.future import IdentityMap, TeamCity
+
+
+class FakeClock(object):
+    def __init__(self):
+        self.now = 0
+
+    def __call__(self):
+        return self.now
+
+
+def test_ttl():
+    clock = FakeClock()
+    identity_map = IdentityMap(ttl=10, clock=clock)
+    identity_map.add('Project', 'p1', 'project')
+
+    clock.now = 9
+    assert identity_map.get('Project', 'p1') == 'project'
+    clock.now = 10
+    assert identity_map.get('Project', 'p1') is None
+    assert len(identity_map) == 0
+    assert (identity_map.hits, identity_map.misses) == (1, 1)
+
+
+def test_lru_eviction():
+    identity_map = IdentityMap(max_size=2)
+    identity_map.add('Project', 'p1', 1)
+    identity_map.add('Project', 'p2', 2)
+    identity_map.get('Project', 'p1')
+    identity_map.add('Project', 'p3', 3)
+
+    assert identity_map.get('Project', 'p2') is None
+    assert identity_map.get('Project', 'p1') == 1
+    assert identity_map.get('Project', 'p3') == 3
+
+
+def test_ids_are_compared_as_strings():
+    identity_map = IdentityMap()
+    identity_map.add('AgentPool', 0, 'pool')
+    assert identity_map.get('AgentPool', '0') == 'pool'
+
+
+@responses.activate
+def test_get_by_id_uses_identity_map():
+    tc = TeamCity(identity_map=IdentityMap())
+    responses.add(
+        responses.GET,
+        tc.relative_url('app/rest/buildTypes/id:bt1'),
+        json={'id': 'bt1', 'name': 'Py27'}, status=200,
+        content_type='application/json',
+    )
+
+    first = tc.build_types.all().get(id='bt1')
+    second = tc.build_types.all().get(id='bt1')
+
+    assert first is second
+    assert len(responses.calls) == 1
+
+
+@responses.activate
+def test_in_bulk_with_only_does_not_fill_identity_map():
+    tc = TeamCity(identity_map=IdentityMap())
+    responses.add(
+        responses.GET,
+        tc.relative_url('app/rest/buildTypes/'),
+        json={'count': 1, 'buildType': [{'id': 'bt1'}]}, status=200,
+    )
+    responses.add(
+        responses.GET,
+        tc.relative_url('app/rest/buildTypes/id:bt1'),
+        json={'id': 'bt1', 'name': 'Py27'}, status=200,
+    )
+
+    tc.build_types.all().only('id').in_bulk(['bt1'])
+    build_type = tc.build_types.all().get(id='bt1')
+
+    assert build_type.name == 'Py27'
+    assert len(responses.calls) == 2
+
+
+@responses.activate
+def test_relations_use_identity_map():
+    tc = TeamCity(identity_map=IdentityMap())
+    responses.add(
+        responses.GET,
+        tc.relative_url('app/rest/builds/'),
+        json={'count': 2, 'build': [
+            {'id': 1, 'buildTypeId': 'bt1'},
+            {'id': 2, 'buildTypeId': 'bt1'},
+        ]},
+        status=200,
+        content_type='application/json',
+    )
+    responses.add(
+        responses.GET,
+        tc.relative_url('app/rest/buildTypes/id:bt1'),
+        json={'id': 'bt1', 'name': 'Py27'}, status=200,
+        content_type='application/json',
+    )
+
+    names = [build.build_type.name for build in tc.builds.all()]
+
+    assert names == ['Py27', 'Py27']
+    assert len(responses.calls) == 2
+
+
+@responses.activate
+def test_uncacheable_entities_are_not_kept():
+    tc = TeamCity(identity_map=IdentityMap())
+    responses.add(
+        responses.GET,
+        tc.relative_url('app/rest/builds/id:1'),
+        json={'id': 1}, status=200,
+        content_type='application/json',
+    )
+
+    tc.builds.all().get(id=1)
+    tc.builds.all().get(id=1)
+
+    assert len(responses.calls) == 2
+    assert len(tc.identity_map) == 0
+
+
+@pytest.mark.parametrize('manager, id, change', [
+    ('build_types', 'bt1', lambda build_type: build_type.set_paused(True)),
+    ('build_types', 'bt1',
+     lambda build_type: build_type.set_parameter('env.A', '1')),
+    ('build_types', 'bt1', lambda build_type: build_type.delete()),
+    ('projects', 'p1', lambda project: project.set_parameter('env.A', '1')),
+    ('projects', 'p1', lambda project: project.set_description('new')),
+    ('projects', 'p1', lambda project: project.delete()),
+    ('vcs_roots', 'r1', lambda vcs_root: vcs_root.delete()),
+])
+@responses.activate
+def test_changes_discard_from_identity_map(manager, id, change):
+    tc = TeamCity(identity_map=IdentityMap())
+    query_set = getattr(tc, manager).all()
+    url = tc.relative_url(query_set.uri.lstrip('/') + 'id:' + id)
+    responses.add(
+        responses.GET, url,
+        json={'id': id, 'name': 'name', 'href': '/guestAuth' +
+              query_set.uri + 'id:' + id},
+        status=200,
+    )
+    for method in (responses.PUT, responses.DELETE):
+        responses.add(method, re.compile(re.escape(url) + '.*'), status=200)
+
+    change(getattr(tc, manager).all().get(id=id))
+    getattr(tc, manager).all().get(id=id)
+
+    gets = [call for call in responses.calls if call.request.method == 'GET']
+    assert len(gets) == 2
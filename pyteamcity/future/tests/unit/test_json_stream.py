@@ -0,0 +1,83 @@
+import json
+
+import pytest
+
+from pyteamcity.future.core import json_stream
+from pyteamcity.future.core.json_stream import iter_array
+
+DOCUMENT = json.dumps({
+    'count': 3,
+    'href': '/guestAuth/app/rest/builds/',
+    'build': [
+        {'id': 1, 'number': 'é1', 'properties': {'property': []}},
+        {'id': 22, 'size': 1.5, 'pinned': None},
+        12345,
+    ],
+    'nextHref': '/guestAuth/app/rest/builds/?locator=start:3',
+}, ensure_ascii=False).encode('utf-8')
+
+
+@pytest.mark.parametrize('chunk_size', [1, 2, 5, 64, len(DOCUMENT)])
+def test_iter_array(chunk_size):
+    chunks = [
+        DOCUMENT[i:i + chunk_size]
+        for i in range(0, len(DOCUMENT), chunk_size)]
+    members = {}
+
+    items = list(iter_array(chunks, 'build', members))
+
+    assert items == json.loads(DOCUMENT.decode('utf-8'))['build']
+    assert members == {
+        'count': 3,
+        'href': '/guestAuth/app/rest/builds/',
+        'nextHref': '/guestAuth/app/rest/builds/?locator=start:3',
+    }
+
+
+def test_iter_array_is_lazy():
+    def chunks():
+        yield b'{"count": 2, "build": [{"id": 1},'
+        raise AssertionError('read too far')
+
+    items = iter_array(chunks(), 'build', {})
+
+    assert next(items) == {'id': 1}
+
+
+def test_iter_array_large_element(monkeypatch):
+    details = 'Traceback\n' * 100000
+    document = json.dumps({'count': 2, 'testOccurrence': [
+        {'id': 1, 'details': details}, {'id': 2}]}).encode('utf-8')
+    chunks = [document[i:i + 1024] for i in range(0, len(document), 1024)]
+    decodes = []
+
+    class CountingDecoder(json.JSONDecoder):
+        def raw_decode(self, s, idx=0):
+            decodes.append(idx)
+            return super(CountingDecoder, self).raw_decode(s, idx)
+
+    monkeypatch.setattr(json_stream, '_decoder', CountingDecoder())
+
+    items = list(iter_array(chunks, 'testOccurrence', {}))
+
+    assert len(chunks) > 900
+    assert [item['id'] for item in items] == [1, 2]
+    assert items[0]['details'] == details
+    # Not once per chunk the element spans
+    assert len(decodes) < 50
+
+
+def test_iter_array_empty():
+    members = {}
+    assert list(iter_array([b' {} '], 'build', members)) == []
+    assert members == {}
+    assert list(iter_array([b'{"build": [],', b'"count": 0}'], 'build',
+                           members)) == []
+    assert members == {'count': 0}
+
+
+@pytest.mark.parametrize('document', [
+    b'[]', b'{"build": [1, 2', b'{"build": [1 2]}', b'{"count": }'])
+def test_iter_array_invalid(document):
+    with pytest.raises(ValueError):
+        list(iter_array([document], 'build', {}))
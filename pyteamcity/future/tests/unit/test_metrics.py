@@ -0,0 +1,92 @@
+import responses
+
+from pyteamcity.future import MetricsCollector, TeamCity
+from pyteamcity.future.core.metrics import url_template
+
+
+def test_url_template():
+    assert url_template(
+        'http://tc/guestAuth/app/rest/builds/id:1467264'
+    ) == '/app/rest/builds/id:*'
+    assert url_template(
+        'http://tc/httpAuth/app/rest/builds/'
+        '?locator=buildType:(id:bt1,project:(id:p1)),count:100'
+        '&fields=count,build($short)'
+    ) == '/app/rest/builds/?locator=buildType:*,count:*'
+    assert url_template(
+        'http://tc/app/rest/builds/id:5/artifacts/content/dir/file.txt'
+    ) == '/app/rest/builds/id:*/artifacts/content/*'
+    assert url_template(
+        'http://tc/app/rest/builds/id:5/artifacts/children/'
+    ) == '/app/rest/builds/id:*/artifacts/children/*'
+    assert url_template(
+        'http://tc/guestAuth/app/rest/agents/'
+    ) == '/app/rest/agents/'
+
+
+def test_hooks():
+    tc = TeamCity()
+    requests_sent = []
+    responses_received = []
+
+    tc.on_request(requests_sent.append)
+
+    @tc.on_response
+    def on_response(response):
+        responses_received.append(response.status_code)
+
+    with responses.RequestsMock() as rsps:
+        rsps.add(
+            responses.GET,
+            tc.relative_url('app/rest/agents/'),
+            json={'count': 0, 'agent': []})
+        list(tc.agents.all())
+
+    assert [request.url for request in requests_sent] == [
+        tc.relative_url('app/rest/agents/')]
+    assert responses_received == [200]
+
+
+@responses.activate
+def test_metrics():
+    metrics = MetricsCollector(buckets=[1, 60])
+    tc = TeamCity(metrics=metrics)
+    build_json = {
+        'id': 1467264,
+        'buildTypeId': 'bt1',
+        'href': '/guestAuth/app/rest/builds/id:1467264',
+    }
+    for build_id in (1467264, 1467265):
+        responses.add(
+            responses.GET,
+            tc.relative_url('app/rest/builds/id:%d' % build_id),
+            json=dict(build_json, id=build_id),
+        )
+    responses.add(
+        responses.PUT,
+        tc.relative_url('app/rest/builds/id:1467264/pin'),
+        status=204,
+    )
+    responses.add(
+        responses.GET,
+        tc.relative_url('app/rest/builds/id:1467264/pin'),
+        body='false',
+        content_type='text/plain',
+    )
+
+    build = tc.builds.all().get(id=1467264)
+    tc.builds.all().get(id=1467265)
+    build.pin('comment')
+
+    snapshot = metrics.snapshot()
+    get_build = snapshot['GET /app/rest/builds/id:*']
+    assert get_build['count'] == 2
+    assert get_build['errors'] == 0
+    assert get_build['latency_histogram'] == [2, 0, 0]
+    assert get_build['response_bytes'] > 0
+    assert get_build['json_decodes'] == 2
+    assert get_build['json_decode_time'] >= 0
+    assert snapshot['PUT /app/rest/builds/id:*/pin']['count'] == 1
+
+    metrics.reset()
+    assert metrics.snapshot() == {}
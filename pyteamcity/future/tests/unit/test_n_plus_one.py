@@ -0,0 +1,96 @@
+import re
+
+import pytest
+import responses
+
+from pyteamcity.future import exceptions, TeamCity
+
+tc = TeamCity()
+
+
+def _add_builds(num_builds):
+    responses.add(
+        responses.GET,
+        tc.relative_url('app/rest/builds/'),
+        json={'count': num_builds, 'build': [
+            {'id': i, 'buildTypeId': 'bt%d' % i} for i in range(num_builds)
+        ]},
+    )
+    responses.add(
+        responses.GET,
+        re.compile(re.escape(tc.relative_url('app/rest/buildTypes/id:'))),
+        json={'id': 'bt', 'name': 'Py27'},
+    )
+
+
+@responses.activate
+def test_warn():
+    _add_builds(4)
+
+    with pytest.warns(exceptions.NPlusOneWarning) as record:
+        with tc.detect_n_plus_one(threshold=3) as detector:
+            for build in tc.builds.all():
+                build.build_type.name
+
+    record = [
+        warning for warning in record
+        if warning.category is exceptions.NPlusOneWarning]
+    assert len(record) == 1
+    assert str(record[0].message) == (
+        '4 GET /app/rest/buildTypes/id:* requests made by Build.build_type,'
+        ' more than the threshold of 3')
+    assert detector.counts['GET /app/rest/buildTypes/id:*'] == 4
+    assert detector.origins['GET /app/rest/buildTypes/id:*'] == {
+        'Build.build_type': 4}
+
+
+@responses.activate
+def test_raise():
+    _add_builds(4)
+
+    with pytest.raises(exceptions.NPlusOneError):
+        with tc.detect_n_plus_one(threshold=2, action='raise'):
+            for build in tc.builds.all():
+                build.build_type.name
+
+    # Detection ends with the block
+    for build in tc.builds.all():
+        build.build_type.name
+
+
+@responses.activate
+def test_below_threshold():
+    _add_builds(3)
+
+    with tc.detect_n_plus_one(threshold=3) as detector:
+        for build in tc.builds.all():
+            build.build_type.name
+
+    assert detector.counts['GET /app/rest/buildTypes/id:*'] == 3
+
+
+@responses.activate
+def test_pages_not_counted():
+    def request_callback(request):
+        return (200, {}, '{"count": 0, "build": []}')
+
+    responses.add_callback(
+        responses.GET,
+        re.compile(re.escape(tc.relative_url('app/rest/builds/'))),
+        callback=request_callback,
+        content_type='application/json',
+    )
+
+    with tc.detect_n_plus_one(threshold=1, action='raise') as detector:
+        query_set = tc.builds.all()
+        for i in range(3):
+            list(query_set[i * 10:i * 10 + 10])
+
+    assert len(responses.calls) == 3
+    assert not detector.counts
+
+
+def test_invalid_action():
+    with pytest.raises(ValueError):
+        with tc.detect_n_plus_one(action='log'):
+            pass
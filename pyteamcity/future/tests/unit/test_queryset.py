@@ -0,0 +1,377 @@
+import json
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+import responses
+
+from pyteamcity.future import exceptions, TeamCity
+
+tc = TeamCity()
+
+
+def _add_paged_builds(num_pages, page_size):
+    """Serve `num_pages` pages of builds linked together by `nextHref`"""
+
+    total = num_pages * page_size
+
+    def request_callback(request):
+        preds = {}
+        if 'locator=' in request.url:
+            locator = request.url.split('locator=')[1].split('&')[0]
+            preds = dict(pred.split(':', 1) for pred in locator.split(','))
+        start = int(preds.get('start', 0))
+        count = int(preds.get('count', page_size))
+        ids = range(start, min(start + count, total))
+        page = {
+            'count': len(ids),
+            'build': [{'id': id, 'buildTypeId': 'bt%d' % id} for id in ids],
+        }
+        if start + count < total:
+            page['nextHref'] = (
+                '/guestAuth/app/rest/builds/?locator=count:%d,start:%d'
+                % (count, start + count))
+        return (200, {}, json.dumps(page))
+
+    responses.add_callback(
+        responses.GET,
+        tc.relative_url('app/rest/builds/'),
+        callback=request_callback,
+        content_type='application/json',
+    )
+
+
+@responses.activate
+def test_iterator_follows_next_href():
+    _add_paged_builds(num_pages=3, page_size=4)
+
+    builds = tc.builds.all()
+    ids = [build.id for build in builds.iterator()]
+
+    assert ids == list(range(12))
+    assert len(responses.calls) == 3
+    assert builds._data_dict == {}
+
+
+@responses.activate
+def test_iterator_without_raw_data():
+    responses.add(
+        responses.GET,
+        tc.relative_url('app/rest/builds/'),
+        json={'count': 1, 'build': [{
+            'id': 1, 'buildTypeId': 'bt1', 'number': '7',
+            'webUrl': 'http://teamcity/viewLog.html?buildId=1',
+            'properties': {'count': 1, 'property': [{'name': 'a'}]},
+        }]},
+    )
+
+    build, = tc.builds.all().iterator(keep_raw=False)
+
+    assert build.number == '7'
+    assert build.web_url == 'http://teamcity/viewLog.html?buildId=1'
+    assert build._data_dict == {
+        'webUrl': 'http://teamcity/viewLog.html?buildId=1'}
+    assert not hasattr(build, '__dict__')
+    with pytest.raises(AttributeError):
+        build.unknown_attribute = True
+
+
+@pytest.mark.parametrize('manager, entity, read', [
+    ('agent_pools', {
+        'id': 0,
+        'agents': {'agent': [{'id': 1, 'name': 'agent-1'}]},
+        'projects': {'project': [{'id': 'p1'}]},
+    }, lambda pool: (pool.agents[0].name, pool.projects[0].id)),
+    ('projects', {
+        'id': 'p1',
+        'projects': {'count': 1, 'project': [{'id': 'p2'}]},
+    }, lambda project: [child.id for child in project.projects]),
+    ('users', {
+        'id': 1,
+        'groups': {'group': [{'key': 'ADMINS'}]},
+    }, lambda user: user.groups[0].key),
+    ('user_groups', {
+        'key': 'ADMINS',
+        'users': {'user': [{'id': 1, 'username': 'alice'}]},
+    }, lambda group: group.users[0].username),
+    ('vcs_roots', {
+        'id': 'r1',
+        'properties': {'property': [
+            {'name': 'url', 'value': 'git@github.com:org/repo.git'},
+            {'name': 'branch', 'value': 'master'},
+            {'name': 'teamcity:branchSpec', 'value': '+:*'}]},
+    }, lambda vcs_root: (
+        repr(vcs_root), vcs_root.url, vcs_root.branch, vcs_root.branch_spec)),
+])
+@responses.activate
+def test_iterator_without_raw_data_keeps_relations(manager, entity, read):
+    query_set = getattr(tc, manager).all()
+    responses.add(
+        responses.GET,
+        tc.relative_url(query_set.uri.lstrip('/')),
+        json={'count': 1, query_set._data_key: [entity]},
+    )
+
+    raw, = getattr(tc, manager).all().iterator()
+    dropped, = getattr(tc, manager).all().iterator(keep_raw=False)
+
+    assert read(dropped) == read(raw)
+
+
+@responses.activate
+def test_iterator_is_lazy():
+    _add_paged_builds(num_pages=3, page_size=4)
+
+    iterator = tc.builds.all().iterator()
+    for _ in range(5):
+        next(iterator)
+
+    assert len(responses.calls) == 2
+
+
+@responses.activate
+def test_iterator_with_prefetch():
+    _add_paged_builds(num_pages=3, page_size=4)
+
+    ids = [build.id for build in tc.builds.all().iterator(prefetch=2)]
+
+    assert ids == list(range(12))
+    assert len(responses.calls) == 3
+
+
+@responses.activate
+def test_iterator_with_prefetch_fetches_ahead():
+    _add_paged_builds(num_pages=3, page_size=4)
+
+    iterator = tc.builds.all().iterator(prefetch=1)
+    next(iterator)
+    deadline = time.time() + 5
+    while len(responses.calls) < 2 and time.time() < deadline:
+        time.sleep(0.01)
+
+    assert len(responses.calls) >= 2
+    iterator.close()
+
+
+@responses.activate
+def test_iterator_with_prefetch_raises_errors():
+    responses.add(
+        responses.GET,
+        tc.relative_url('app/rest/builds/'),
+        status=500,
+    )
+
+    with pytest.raises(exceptions.HTTPError):
+        list(tc.builds.all().iterator(prefetch=2))
+
+
+@responses.activate
+def test_iterator_stream():
+    _add_paged_builds(num_pages=3, page_size=4)
+
+    ids = [build.id for build in tc.builds.all().iterator(stream=True)]
+
+    assert ids == list(range(12))
+    assert len(responses.calls) == 3
+
+
+@responses.activate
+def test_iterator_stream_with_select_related():
+    responses.add(
+        responses.GET,
+        tc.relative_url('app/rest/builds/'),
+        json={'count': 1, 'build': [{
+            'id': 1, 'buildType': {'id': 'bt1', 'name': 'Build type 1'}}]},
+    )
+
+    builds = list(tc.builds.all().select_related('build_type').iterator(
+        stream=True))
+
+    assert builds[0].build_type.name == 'Build type 1'
+    assert len(responses.calls) == 1
+
+
+@responses.activate
+def test_iterator_stream_raises_errors():
+    responses.add(
+        responses.GET,
+        tc.relative_url('app/rest/builds/'),
+        status=500,
+    )
+
+    with pytest.raises(exceptions.HTTPError):
+        list(tc.builds.all().iterator(stream=True))
+    with pytest.raises(exceptions.IllegalOperation):
+        list(tc.builds.all().iterator(stream=True, prefetch=2))
+
+
+@responses.activate
+def test_fetch_all():
+    _add_paged_builds(num_pages=3, page_size=4)
+
+    builds = tc.builds.all().fetch_all()
+
+    assert [build.id for build in builds] == list(range(12))
+    assert builds.count() == 12
+
+
+@responses.activate
+def test_fetch_all_parallel():
+    _add_paged_builds(num_pages=5, page_size=4)
+
+    builds = tc.builds.all().fetch_all(parallel=2)
+
+    assert [build.id for build in builds] == list(range(20))
+    assert len(responses.calls) == 5
+    urls = [call.request.url for call in responses.calls]
+    assert any(url.endswith('start:16,count:4') for url in urls)
+
+
+class SlowTeamCity(TeamCity):
+    """Widens the gap between building a request's URL and sending it"""
+
+    @property
+    def single_flight(self):
+        time.sleep(0.001)
+        return None
+
+    @single_flight.setter
+    def single_flight(self, value):
+        pass
+
+
+@responses.activate
+def test_fetch_all_parallel_overlapping_windows():
+    _add_paged_builds(num_pages=30, page_size=4)
+
+    builds = SlowTeamCity().builds.all().fetch_all(parallel=8)
+
+    assert [build.id for build in builds] == list(range(120))
+
+
+def test_fetch_all_parallel_unpaged():
+    with pytest.raises(exceptions.IllegalOperation):
+        tc.projects.all().fetch_all(parallel=4)
+
+
+@responses.activate
+def test_count_requests_only_the_count():
+    responses.add(
+        responses.GET,
+        tc.relative_url('app/rest/buildQueue/'),
+        json={'count': 42}, status=200,
+        content_type='application/json',
+    )
+
+    queued_builds = tc.queued_builds.all().filter(build_type='bt1')
+
+    assert queued_builds.count() == 42
+    assert len(queued_builds) == 42
+    assert len(responses.calls) == 1
+    assert responses.calls[0].request.url.endswith(
+        '?locator=buildType:bt1&fields=count')
+
+
+@responses.activate
+def test_count_uses_fetched_page():
+    _add_paged_builds(num_pages=1, page_size=3)
+
+    builds = tc.builds.all()
+    list(builds)
+
+    assert len(builds) == 3
+    assert len(responses.calls) == 1
+
+
+@responses.activate
+def test_getitem_fetches_only_the_window():
+    _add_paged_builds(num_pages=100, page_size=4)
+
+    builds = tc.builds.all()
+
+    assert builds[250].id == 250
+    assert [build.id for build in builds[100:103]] == [100, 101, 102]
+    assert [build.id for build in builds[10:16:2]] == [10, 12, 14]
+    assert len(responses.calls) == 3
+    assert responses.calls[0].request.url.endswith('start:250,count:1')
+    assert responses.calls[1].request.url.endswith('start:100,count:3')
+
+
+@responses.activate
+def test_getitem_respects_start_and_count():
+    _add_paged_builds(num_pages=100, page_size=4)
+
+    builds = tc.builds.all().filter(start=10, count=5)
+
+    assert [build.id for build in builds[3:100]] == [13, 14]
+    with pytest.raises(IndexError):
+        builds[5]
+
+
+@responses.activate
+def test_getitem_uses_fetched_page():
+    _add_paged_builds(num_pages=1, page_size=4)
+
+    builds = tc.builds.all()
+    list(builds)
+
+    assert builds[2].id == 2
+    assert [build.id for build in builds[1:3]] == [1, 2]
+    assert len(responses.calls) == 1
+
+
+def test_getitem_negative_index():
+    with pytest.raises(ValueError):
+        tc.builds.all()[-1]
+
+
+def test_filter_returns_a_new_query_set():
+    base = tc.builds.all().filter(build_type='bt1')
+    running = base.filter(running=True)
+    projected = running.only('id')
+
+    assert base._get_url().endswith('?locator=buildType:bt1')
+    assert running._get_url().endswith('?locator=buildType:bt1,running:True')
+    assert 'fields=' not in running._get_url()
+    assert 'fields=' in projected._get_url()
+
+
+def test_get_does_not_modify_query_set():
+    base = tc.builds.all().filter(build_type='bt1')
+    base.get(number='12', just_url=True)
+    assert base._get_url().endswith('?locator=buildType:bt1')
+
+
+@responses.activate
+def test_shared_between_threads():
+    def request_callback(request):
+        if 'id:' not in request.url:
+            # A single page of every build, slow enough for all threads
+            # calling `fetch_all` to be waiting on it at once
+            time.sleep(0.05)
+            return (200, {}, json.dumps({
+                'count': 100, 'build': [{'id': id} for id in range(100)]}))
+        id = int(request.url.rsplit('id:', 1)[1])
+        return (200, {}, json.dumps({'id': id, 'number': str(id)}))
+
+    responses.add_callback(
+        responses.GET,
+        re.compile(r'.*/app/rest/builds/.*'),
+        callback=request_callback,
+        content_type='application/json',
+    )
+    base = tc.builds.all().filter(build_type='bt1')
+
+    with ThreadPoolExecutor(max_workers=32) as executor:
+        builds = list(executor.map(
+            lambda id: base.filter(id=id).get(), range(200)))
+
+    assert [build.number for build in builds] == [str(id) for id in range(200)]
+    assert base._get_url().endswith('?locator=buildType:bt1')
+
+    all_builds = tc.builds.all()
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        list(executor.map(lambda _: all_builds.fetch_all(), range(8)))
+
+    assert [build.id for build in all_builds] == list(range(100))
@@ -0,0 +1,113 @@
+import json
+
+import pytest
+import requests
+import responses
+
+from pyteamcity.future import exceptions, RetryPolicy, TeamCity
+
+
+def _teamcity(**kwargs):
+    delays = []
+    retry = RetryPolicy(sleep=delays.append, random=lambda: 1.0, **kwargs)
+    return TeamCity(retry=retry), retry, delays
+
+
+def _add_agents(tc, status=200, **kwargs):
+    responses.add(
+        responses.GET,
+        tc.relative_url('app/rest/agents/'),
+        json={'count': 1, 'agent': [{'id': 1, 'name': 'agent1'}]},
+        status=status,
+        **kwargs)
+
+
+def test_backoff():
+    retry = RetryPolicy(backoff_factor=0.5, max_backoff=3, random=lambda: 1.0)
+    assert [retry.backoff(n) for n in range(4)] == [0.5, 1, 2, 3]
+
+
+@responses.activate
+def test_retry_on_server_error():
+    tc, retry, delays = _teamcity()
+    _add_agents(tc, status=502)
+    _add_agents(tc, status=500)
+    _add_agents(tc)
+
+    agents = list(tc.agents.all())
+
+    assert [agent.name for agent in agents] == ['agent1']
+    assert len(responses.calls) == 3
+    assert delays == [0.5, 1.0]
+    assert retry.retries == 2
+    assert retry.failures == 0
+
+
+@responses.activate
+def test_retry_after():
+    tc, retry, delays = _teamcity()
+    _add_agents(tc, status=429, headers={'Retry-After': '7'})
+    _add_agents(tc, status=503, headers={'Retry-After': '120'})
+    _add_agents(tc)
+
+    list(tc.agents.all())
+
+    assert delays == [7.0, 60]
+
+
+@responses.activate
+def test_retry_on_connection_error():
+    tc, retry, delays = _teamcity()
+    responses.add(
+        responses.GET,
+        tc.relative_url('app/rest/agents/'),
+        body=requests.ConnectionError('Connection reset by peer'))
+    _add_agents(tc)
+
+    list(tc.agents.all())
+
+    assert len(responses.calls) == 2
+    assert retry.retries == 1
+
+
+@responses.activate
+def test_give_up():
+    tc, retry, delays = _teamcity(total=2)
+    _add_agents(tc, status=503)
+
+    with pytest.raises(exceptions.HTTPError) as excinfo:
+        list(tc.agents.all())
+
+    assert excinfo.value.status_code == 503
+    assert len(responses.calls) == 3
+    assert retry.retries == 2
+    assert retry.failures == 1
+
+
+@responses.activate
+def test_no_retry_on_client_error():
+    tc, retry, delays = _teamcity()
+    _add_agents(tc, status=404)
+
+    with pytest.raises(exceptions.HTTPError):
+        list(tc.agents.all())
+
+    assert len(responses.calls) == 1
+    assert retry.retries == 0
+
+
+@responses.activate
+def test_no_retry_of_post():
+    tc, retry, delays = _teamcity()
+    responses.add(
+        responses.POST,
+        tc.relative_url('app/rest/buildQueue'),
+        status=503)
+
+    res = tc.session.post(
+        tc.relative_url('app/rest/buildQueue'),
+        data=json.dumps({'buildType': {'id': 'bt1'}}))
+
+    assert res.status_code == 503
+    assert len(responses.calls) == 1
+    assert retry.retries == 0
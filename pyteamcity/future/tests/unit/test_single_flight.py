@@ -0,0 +1,107 @@
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+import responses
+
+from pyteamcity.future import exceptions, SingleFlight, TeamCity
+
+
+def _wait_for(condition, timeout=5):
+    deadline = time.time() + timeout
+    while not condition():
+        assert time.time() < deadline
+        time.sleep(0.001)
+
+
+def test_do():
+    single_flight = SingleFlight()
+    assert single_flight.do('key', lambda: 42) == 42
+    assert single_flight.do('key', lambda: 43) == 43
+    assert single_flight.shared == 0
+
+
+def test_do_concurrent():
+    single_flight = SingleFlight()
+    release = threading.Event()
+    calls = []
+
+    def function():
+        calls.append(1)
+        release.wait()
+        return {'value': 42}
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        futures = [
+            executor.submit(single_flight.do, 'key', function)
+            for _ in range(4)]
+        _wait_for(lambda: single_flight.shared == 3)
+        release.set()
+        results = [future.result() for future in futures]
+
+    assert len(calls) == 1
+    assert results == [{'value': 42}] * 4
+    assert all(result is results[0] for result in results)
+
+
+def test_do_concurrent_error():
+    single_flight = SingleFlight()
+    release = threading.Event()
+
+    def function():
+        release.wait()
+        raise ValueError('boom')
+
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        futures = [
+            executor.submit(single_flight.do, 'key', function)
+            for _ in range(3)]
+        _wait_for(lambda: single_flight.shared == 2)
+        release.set()
+        for future in futures:
+            with pytest.raises(ValueError):
+                future.result()
+
+    assert single_flight.do('key', lambda: 'retried') == 'retried'
+
+
+@responses.activate
+def test_coalesce_build_type_requests():
+    tc = TeamCity(single_flight=SingleFlight())
+    release = threading.Event()
+
+    def request_callback(request):
+        release.wait()
+        return (200, {}, json.dumps({'id': 'bt1', 'name': 'Build'}))
+
+    responses.add_callback(
+        responses.GET,
+        tc.relative_url('app/rest/buildTypes/id:bt1'),
+        callback=request_callback,
+        content_type='application/json',
+    )
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        futures = [
+            executor.submit(lambda: tc.build_types.all().get(id='bt1'))
+            for _ in range(8)]
+        _wait_for(lambda: tc.single_flight.shared == 7)
+        release.set()
+        build_types = [future.result() for future in futures]
+
+    assert len(responses.calls) == 1
+    assert {build_type.id for build_type in build_types} == {'bt1'}
+
+
+@responses.activate
+def test_coalesced_error():
+    tc = TeamCity(single_flight=SingleFlight())
+    responses.add(
+        responses.GET,
+        tc.relative_url('app/rest/agents/'),
+        status=500)
+
+    with pytest.raises(exceptions.HTTPError):
+        list(tc.agents.all())
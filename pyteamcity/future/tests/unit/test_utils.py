@@ -0,0 +1,31 @@
+import dateutil.parser
+import pytest
+
+from pyteamcity.future.core.utils import parse_date_string
+
+
+@pytest.mark.parametrize('date_string', [
+    '20161123T142834+0000',
+    '20161123T142834-0000',
+    '20160229T235959+0530',
+    '20161123T000000-0800',
+    '2016-11-23T14:28:34Z',
+    '20161123T142834',
+])
+def test_parse_date_string(date_string):
+    date = parse_date_string(date_string)
+    expected = dateutil.parser.parse(date_string)
+    assert date == expected
+    assert date.tzinfo == expected.tzinfo
+    assert date.utcoffset() == expected.utcoffset()
+
+
+def test_parse_date_string_time_zones_are_shared():
+    date1 = parse_date_string('20161123T142834+0200')
+    date2 = parse_date_string('20170101T000000+0200')
+    assert date1.tzinfo is date2.tzinfo
+
+
+def test_parse_date_string_invalid():
+    with pytest.raises(ValueError):
+        parse_date_string('20161332T142834+0000')
@@ -3,6 +3,11 @@ from .core.utils import parse_date_string
 
 
 class User(object):
+    __slots__ = (
+        'id', 'username', 'name', 'email', 'href', 'last_login_string',
+        'query_set', '_data_dict', '_related')
+    _retained_keys = ('groups',)
+
     def __init__(self, id,
                  username, name, email, href, last_login_string,
                  query_set, data_dict=None):
@@ -52,14 +57,13 @@ class User(object):
 class UserQuerySet(QuerySet):
     uri = '/app/rest/users/'
     _entity_factory = User
+    _data_key = 'user'
+    _cacheable = True
 
     def filter(self, id=None, username=None):
+        query_set = self._clone()
         if id is not None:
-            self._add_pred('id', id)
+            query_set._add_pred('id', id)
         if username is not None:
-            self._add_pred('username', username)
-        return self
-
-    def __iter__(self):
-        return (self.__class__._entity_factory.from_dict(d, self)
-                for d in self._data()['user'])
+            query_set._add_pred('username', username)
+        return query_set
@@ -2,6 +2,11 @@ from .core.queryset import QuerySet
 
 
 class UserGroup(object):
+    __slots__ = (
+        'key', 'name', 'description', 'href', 'query_set', '_data_dict',
+        '_related')
+    _retained_keys = ('users',)
+
     def __init__(self, key,
                  name, description, href,
                  query_set, data_dict=None):
@@ -43,14 +48,12 @@ class UserGroup(object):
 class UserGroupQuerySet(QuerySet):
     uri = '/app/rest/userGroups/'
     _entity_factory = UserGroup
+    _data_key = 'group'
 
     def filter(self, key=None, name=None):
+        query_set = self._clone()
         if key is not None:
-            self._add_pred('key', key)
+            query_set._add_pred('key', key)
         if name is not None:
-            self._add_pred('name', name)
-        return self
-
-    def __iter__(self):
-        return (self.__class__._entity_factory.from_dict(d, self)
-                for d in self._data()['group'])
+            query_set._add_pred('name', name)
+        return query_set
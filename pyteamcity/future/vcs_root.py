@@ -1,9 +1,14 @@
+from .core.identity_map import discard_entity
 from .core.parameter import Parameter
 from .core.queryset import QuerySet
 from .core.utils import raise_on_status
 
 
 class VCSRoot(object):
+    __slots__ = (
+        'id', 'name', 'href', 'teamcity', 'query_set', '_data_dict', '_related')
+    _retained_keys = ('properties',)
+
     def __init__(self, id,
                  name, href,
                  teamcity, query_set, data_dict=None):
@@ -63,22 +68,22 @@ class VCSRoot(object):
         url = self.teamcity.base_base_url + self.href
         res = self.teamcity.session.delete(url)
         raise_on_status(res)
+        discard_entity(self)
 
 
 class VCSRootQuerySet(QuerySet):
     uri = '/app/rest/vcs-roots/'
     _entity_factory = VCSRoot
+    _data_key = 'vcs-root'
+    _cacheable = True
 
     def filter(self, id=None, name=None):
+        query_set = self._clone()
         if id is not None:
-            self._add_pred('id', id)
+            query_set._add_pred('id', id)
         if name is not None:
-            self._add_pred('name', name)
-        return self
-
-    def __iter__(self):
-        return (self.__class__._entity_factory.from_dict(d, self)
-                for d in self._data()['vcs-root'])
+            query_set._add_pred('name', name)
+        return query_set
 
     def create(self,
                name, vcs_name, url, branch, branch_spec='',
@@ -25,7 +25,7 @@ setup(
     maintainer_email='marc@marc-abramowitz.com',
     author='Yotam Oron',
     author_email='yotamoron@yahoo.com',
-    packages=find_packages(),
+    packages=find_packages(exclude=['benchmarks']),
     zip_safe=False,
     install_requires=[
         'beautifulsoup4',
@@ -35,6 +35,15 @@ setup(
         'six',
     ],
     extras_require={
+        'async': [
+            'aiohttp',
+        ],
+        'numpy': [
+            'numpy',
+        ],
+        'pandas': [
+            'pandas',
+        ],
         'tests': [
             'mock >= 2.0.0',
             'pytest >= 3.0.2',